@@ -1,74 +1,138 @@
 # Importing libraries
 
+import numbers
+import types
 import numpy as np
-import copy
 import matplotlib.pyplot as plt
 import seaborn as sns
 
 
+def merge(values, probabilities, tolerance=1e-12):
+    """ Sort outcomes and sum the probabilities of equal values, returning (values, probabilities) arrays.
+    Values within a relative tolerance of their neighbour count as equal, so that outcomes that differ
+    only by floating point rounding (e.g., 0.1 + 0.2 and 0.3) merge into one at their mean """
+    values, inverse = np.unique(np.asarray(values, dtype=float).ravel(), return_inverse=True)
+    probabilities = np.bincount(inverse.ravel(), weights=np.asarray(probabilities, dtype=float).ravel(),
+                                minlength=len(values))
+    close = np.diff(values) <= tolerance * np.maximum(np.abs(values[1:]), np.abs(values[:-1]))
+    if close.any():
+        groups = np.concatenate(([0], np.cumsum(~close)))
+        mass = np.bincount(groups, weights=probabilities)
+        moment = np.bincount(groups, weights=probabilities * values)
+        values = np.divide(moment, mass, out=values[np.r_[0, np.flatnonzero(~close) + 1]], where=mass > 0)
+        probabilities = mass
+    return values, probabilities
+
+
 class DRV:
-    """ A model for discrete random variables where outcomes are numeric """
+    """ A model for discrete random variables where outcomes are numeric.
+    Outcomes are kept as a sorted array of distinct values and a matching array of probabilities """
+    max_support = None  # results of arithmetic with more outcomes than this are rebinned (None: never)
+    rebin_method = 'quantile'  # 'width', 'log' or 'quantile', see rebin()
+
     def __init__(self, dist=None, type=None, min_max=None, mean_std=None, bins=None, num_samples=None):
-        self.dist = {} if dist is None else copy.deepcopy(dist)
+        self.values = np.empty(0)
+        self.probabilities = np.empty(0)
         self.type = type
         self.min_max = min_max
         self.mean_std = mean_std
         self.bins = bins
         self.num_samples = num_samples
+        self.rebinned = []  # one record per rebinning this DRV or its operands went through, see rebin()
+        self.cdf = None  # (probabilities it was built from, cumulative probabilities), built by the first sample()
 
+        if dist is not None:
+            self.values, self.probabilities = merge(list(dist.keys()), list(dist.values()))
         if self.type == 'uniform':
             self.generate_uniform()
         elif self.type == 'normal' and mean_std is not None:
             self.generate_normal(mean_std, bins, num_samples)
 
+    @staticmethod
+    def from_arrays(values, probabilities):
+        """ A DRV with the given outcomes, merging equal values """
+        drv = DRV()
+        drv.values, drv.probabilities = merge(values, probabilities)
+        return drv
+
+    @property
+    def dist(self):
+        """ A read-only view of the distribution, value -> probability. Writing to it raises TypeError:
+        change probabilities with drv[x] = p """
+        return types.MappingProxyType(dict(zip(self.values.tolist(), self.probabilities.tolist())))
+
     def generate_uniform(self):
         """ Generates a uniform distribution with specified bins and range"""
         min_val, max_val = self.min_max
         bin_edges = np.linspace(min_val, max_val, num=self.bins + 1)
         bin_centers = bin_edges[:-1] + (bin_edges[1:] - bin_edges[:-1]) / 2
-        self.dist = dict(zip(bin_centers, np.full(self.bins, 1 / self.bins)))
+        self.values, self.probabilities = bin_centers, np.full(self.bins, 1 / self.bins)
 
     def generate_normal(self, mean_std, bins, num_samples):
-        """Generates a normal distribution with specified mean, standard deviation, bins, and number of samples"""
+        """Generates a normal distribution with specified mean, standard deviation, bins, and number of samples.
+        Samples outside min_max, when given, are discarded"""
         mean, std_dev = mean_std
         samples = np.random.normal(mean, std_dev, size=num_samples)
-        bin_edges = np.linspace(np.min(samples), np.max(samples), bins + 1)
+        if self.min_max is not None:
+            samples = samples[(samples >= self.min_max[0]) & (samples <= self.min_max[1])]
+        counts, bin_edges = np.histogram(samples, bins=bins)
         bin_centers = (bin_edges[:-1] + bin_edges[1:]) / 2
-        bin_widths = bin_edges[1:] - bin_edges[:-1]
-        self.dist = dict(zip(bin_centers, bin_widths))
+        self.values, self.probabilities = merge(bin_centers, counts / counts.sum())
 
     def __getitem__(self, x):
-        return self.dist.get(x, 0.0)
+        i = np.searchsorted(self.values, x)
+        return float(self.probabilities[i]) if i < len(self.values) and self.values[i] == x else 0.0
 
     def __setitem__(self, x, p):
-        self.dist[x] = p
+        i = np.searchsorted(self.values, x)
+        if i < len(self.values) and self.values[i] == x:
+            self.probabilities[i] = p
+        else:
+            self.values = np.insert(self.values, i, x)
+            self.probabilities = np.insert(self.probabilities, i, p)
+        self.cdf = None
 
     def expected_value(self):
         """Compute the expected value of the distribution"""
-        values, probabilities = np.array(list(self.dist.keys())), np.array(list(self.dist.values()))
-        return np.sum(values * probabilities)
+        return np.sum(self.values * self.probabilities)
 
     def standard_deviation(self):
         """Compute the standard deviation of the distribution"""
-        values, probabilities = np.array(list(self.dist.keys())), np.array(list(self.dist.values()))
         expected_val = self.expected_value()
-        variance = np.sum(((values - expected_val) ** 2) * probabilities)
+        variance = np.sum(((self.values - expected_val) ** 2) * self.probabilities)
         return np.sqrt(variance)
 
-    def sample(self):
-        """Randomly sample a value from the distribution"""
-        values, probabilities = np.array(list(self.dist.keys())), np.array(list(self.dist.values()))
-        sampled_value = np.random.choice(values, p=probabilities)
-        return sampled_value
+    def variance(self):
+        """Compute the variance of the distribution"""
+        return self.standard_deviation() ** 2
+
+    def quantile(self, q):
+        """The smallest value whose cumulative probability reaches q, for a number or an array of q"""
+        cumulative = np.cumsum(self.probabilities)
+        index = np.searchsorted(cumulative, np.asarray(q) * cumulative[-1] * (1 - 1e-12), side='left')
+        return self.values[np.minimum(index, len(self.values) - 1)]
+
+    def sample(self, n=None, rng=None):
+        """Randomly sample a value from the distribution, or an array of n values. Draws are inverse-CDF lookups
+        in a cumulative table built once and kept until the distribution changes. rng is a numpy Generator;
+        by default draws come from np.random"""
+        if self.cdf is None or self.cdf[0] is not self.probabilities:
+            cumulative = np.cumsum(self.probabilities)
+            if len(cumulative) == 0 or not np.isclose(cumulative[-1], 1.0):
+                raise ValueError("probabilities do not sum to 1")
+            self.cdf = (self.probabilities, cumulative / cumulative[-1])
+        uniform = np.random.random(n) if rng is None else rng.random(n)
+        index = np.minimum(np.searchsorted(self.cdf[1], uniform, side='right'), len(self.values) - 1)
+        return self.values[index]
 
     def plot(self, title='', xscale='', yscale='', show_cumulative=False, log_scale=False, trials=0, bins=20):
         """Display the DRV distribution"""
         plt.figure(figsize=(10, 6))
 
         if trials == 0:
-            plt.bar(self.dist.keys(), self.dist.values())
+            plt.bar(self.values, self.probabilities)
         else:
-            sample = [self.sample() for i in range(trials)]
+            sample = self.sample(trials)
             sns.displot(sample, stat='probability', bins=bins, cumulative=show_cumulative, log_scale=log_scale)
 
         plt.title(title)
@@ -76,10 +140,109 @@ class DRV:
         plt.ylabel('Probability')
         plt.show()
 
-    def multiply(self, other):
+    def rebin(self, size, method=None):
+        """A DRV with at most size outcomes. Outcomes are grouped into bins and each bin's probability is
+        placed at the bin's conditional mean, so the total mass and the mean are preserved and only the spread
+        within each bin is lost. Bins are
+        'width': equal-width over the range of values
+        'log': equal-width in log space, for positive values spanning orders of magnitude
+        'quantile': holding equal probability mass, so that likely regions keep the most detail
+        The result's rebinned list gains a record with the support sizes and the errors in mean and variance"""
+        method = method or DRV.rebin_method
+        if len(self.values) <= size:
+            return self
+
+        if method == 'width':
+            edges = np.linspace(self.values[0], self.values[-1], size + 1)
+            bins = np.clip(np.searchsorted(edges, self.values, side='right') - 1, 0, size - 1)
+        elif method == 'log':
+            if self.values[0] <= 0:
+                raise ValueError("log rebinning needs positive values")
+            edges = np.geomspace(self.values[0], self.values[-1], size + 1)
+            bins = np.clip(np.searchsorted(edges, self.values, side='right') - 1, 0, size - 1)
+        elif method == 'quantile':
+            # Each outcome goes to the bin holding the midpoint of its probability mass
+            midpoints = np.cumsum(self.probabilities) - self.probabilities / 2
+            bins = np.minimum((midpoints / self.probabilities.sum() * size).astype(int), size - 1)
+        else:
+            raise ValueError(f"Unknown rebinning method: {method}")
+
+        mass = np.bincount(bins, weights=self.probabilities, minlength=size)
+        moment = np.bincount(bins, weights=self.probabilities * self.values, minlength=size)
+        occupied = mass > 0
+        result = DRV.from_arrays(moment[occupied] / mass[occupied], mass[occupied])
+
+        mean, variance = self.expected_value(), self.variance()
+        result.rebinned = self.rebinned + [{
+            'method': method, 'before': len(self.values), 'after': len(result.values),
+            'mean_error': float(result.expected_value() - mean), 'variance_error': float(result.variance() - variance),
+            'relative_variance_error': float((result.variance() - variance) / variance) if variance else 0.0}]
+        return result
+
+    def apply(self, other, op, max_support=None, method=None):
+        """Combine two DRVs, or a DRV and a number, with a NumPy ufunc op applied to every pair of outcomes at
+        once, summing the probabilities of equal results. The operands are treated as independent, even when
+        they are the same DRV: X + X is the sum of two independent draws of X. A result with more than max_support
+        (default: DRV.max_support) outcomes is rebinned with the given method (default: DRV.rebin_method).
+        Any other operand gives NotImplemented, so that Python falls back to its reflected operator"""
+        if not isinstance(other, (DRV, numbers.Number)):
+            return NotImplemented
+        other = other if isinstance(other, DRV) else DRV(dist={other: 1.0})
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            values = op.outer(self.values, other.values)
+        if not np.isfinite(values).all():
+            raise ValueError(f"{op.__name__} is undefined for some pair of outcomes")
+        result = DRV.from_arrays(values, np.multiply.outer(self.probabilities, other.probabilities))
+        result.rebinned = self.rebinned + other.rebinned
+        max_support = max_support or DRV.max_support
+        return result.rebin(max_support, method) if max_support else result
+
+    def multiply(self, other, max_support=None, method=None):
         """Multiply two DRV distributions"""
-        result_dist = {}
-        for x, px in self.dist.items():
-            for y, py in other.dist.items():
-                result_dist[x * y] = px * py
-        return DRV(dist=result_dist)
+        return self.apply(other, np.multiply, max_support, method)
+
+    def __add__(self, other):
+        return self.apply(other, np.add)
+
+    def __radd__(self, other):
+        return self.reflected(other, np.add)
+
+    def __sub__(self, other):
+        return self.apply(other, np.subtract)
+
+    def __rsub__(self, other):
+        return self.reflected(other, np.subtract)
+
+    def __mul__(self, other):
+        return self.apply(other, np.multiply)
+
+    def __rmul__(self, other):
+        return self.reflected(other, np.multiply)
+
+    def reflected(self, other, op):
+        """other op self, for a number other"""
+        if not isinstance(other, numbers.Number):
+            return NotImplemented
+        return DRV(dist={other: 1.0}).apply(self, op)
+
+    def __truediv__(self, other):
+        if not isinstance(other, (DRV, numbers.Number)):
+            return NotImplemented
+        denominator = other.values if isinstance(other, DRV) else np.array([other])
+        if (denominator == 0).any():
+            raise ZeroDivisionError("the denominator's outcomes include 0")
+        return self.apply(other, np.true_divide)
+
+    def __rtruediv__(self, other):
+        if not isinstance(other, numbers.Number):
+            return NotImplemented
+        return DRV(dist={other: 1.0}) / self
+
+    def __pow__(self, other):
+        return self.apply(other, np.power)
+
+    def __rpow__(self, other):
+        return self.reflected(other, np.power)
+
+    def __neg__(self):
+        return DRV.from_arrays(-self.values, self.probabilities)
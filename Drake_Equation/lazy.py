@@ -0,0 +1,191 @@
+"""
+Lazy DRV expressions
+Arithmetic on lazy DRVs builds an expression graph instead of computing distributions. Nothing is
+materialized until a statistic, a sample or a plot is requested, and then
+- equal subexpressions are computed once, including sums and products of the same operands written
+  in a different order or grouping,
+- chains of + or * are combined smallest supports first, keeping intermediate results small,
+- the mean and standard deviation of sums, differences, products and negations are computed from the
+  operands' moments, without materializing any distribution
+
+Like DRV arithmetic, every operation treats its two operands as independent, even when they are built
+from the same variables: X + X is the sum of two independent draws of X (standard deviation sqrt(2) times
+that of X), not 2 * X. Dependent variables are not modelled; write 2 * X for the scaled variable.
+"""
+
+import heapq
+from collections import Counter
+import numpy as np
+from drv import DRV
+
+OPS = {'add': np.add, 'sub': np.subtract, 'mul': np.multiply, 'div': np.true_divide, 'pow': np.power}
+COMMUTATIVE = ('add', 'mul')
+
+
+def lazy(drv):
+    """ Wrap a DRV (or a number) as a leaf of an expression graph """
+    return drv if isinstance(drv, Expr) else Expr(None, (), drv)
+
+
+class Expr:
+    """ A node of an expression graph: an operation on other nodes, or a leaf holding a DRV or a number """
+
+    def __init__(self, op, args, value=None):
+        self.op = op
+        self.args = args
+        self.value = value  # the leaf's DRV or number; for an operation, its memoized DRV once computed
+        self.moments = None  # memoized (E[X], E[X^2]) or False when they can't be derived from the operands
+        if op is None:
+            constant = not isinstance(value, DRV)
+            self.key = ('const', value) if constant else ('leaf', id(value))
+        elif op in COMMUTATIVE:
+            # A chain of one commutative operation is keyed by its operands in a canonical order, so that
+            # e.g. A * B and B * A, or (A * B) * C and A * (B * C), are recognized as the same subexpression
+            operands = [key for arg in args for key in (arg.key[1:] if arg.op == op else (arg.key,))]
+            self.key = (op,) + tuple(sorted(operands, key=repr))
+        else:
+            self.key = (op,) + tuple(arg.key for arg in args)
+
+    def _node(self, op, other, reflected=False):
+        other = lazy(other)
+        return Expr(op, (other, self) if reflected else (self, other))
+
+    def __add__(self, other):
+        return self._node('add', other)
+
+    def __radd__(self, other):
+        return self._node('add', other, reflected=True)
+
+    def __sub__(self, other):
+        return self._node('sub', other)
+
+    def __rsub__(self, other):
+        return self._node('sub', other, reflected=True)
+
+    def __mul__(self, other):
+        return self._node('mul', other)
+
+    def __rmul__(self, other):
+        return self._node('mul', other, reflected=True)
+
+    def __truediv__(self, other):
+        return self._node('div', other)
+
+    def __rtruediv__(self, other):
+        return self._node('div', other, reflected=True)
+
+    def __pow__(self, other):
+        return self._node('pow', other)
+
+    def __rpow__(self, other):
+        return self._node('pow', other, reflected=True)
+
+    def __neg__(self):
+        return Expr('neg', (self,))
+
+    def evaluate(self, cache=None, shared=None):
+        """ Materialize the distribution of this expression, computing each distinct subexpression once """
+        if cache is None:
+            cache, counts = {}, Counter()
+            self._count(counts, set())
+            shared = {key for key, count in counts.items() if count > 1}
+        shared = set() if shared is None else shared
+        if self.op is None:
+            return self.value if isinstance(self.value, DRV) else DRV(dist={self.value: 1.0})
+        if self.value is not None:
+            return self.value
+        if self.key in cache:
+            self.value = cache[self.key]
+            return self.value
+
+        if self.op == 'neg':
+            result = -self.args[0].evaluate(cache, shared)
+        elif self.op in COMMUTATIVE:
+            # Combine the whole chain of this operation, the two smallest supports at a time. Every partial
+            # result is cached under the operands it combines, so other chains can reuse it
+            operands = self._chain(self.op, cache, shared)
+            heap = [(len(drv.values), i, operand.key[1:] if operand.op == self.op else (operand.key,), drv)
+                    for i, (operand, drv) in enumerate((o, o.evaluate(cache, shared)) for o in operands)]
+            heapq.heapify(heap)
+            count = len(heap)
+            while len(heap) > 1:
+                _, _, keys_a, a = heapq.heappop(heap)
+                _, _, keys_b, b = heapq.heappop(heap)
+                keys = tuple(sorted(keys_a + keys_b, key=repr))
+                combined = cache.get((self.op,) + keys)
+                if combined is None:
+                    combined = cache[(self.op,) + keys] = a.apply(b, OPS[self.op])
+                heapq.heappush(heap, (len(combined.values), count, keys, combined))
+                count += 1
+            result = heap[0][3]
+        else:
+            left, right = (arg.evaluate(cache, shared) for arg in self.args)
+            result = left / right if self.op == 'div' else left.apply(right, OPS[self.op])
+
+        cache[self.key] = self.value = result
+        return result
+
+    def _count(self, counts, visited):
+        """ Count how often each subexpression key occurs in the graph below this node """
+        counts[self.key] += 1
+        if id(self) not in visited:
+            visited.add(id(self))
+            for arg in self.args:
+                arg._count(counts, visited)
+
+    def _chain(self, op, cache, shared, top=True):
+        """ The operands of a chain of the same commutative operation, e.g., a, b, c, d for (a * b) * (c * d).
+        Subexpressions that are already computed, or that occur elsewhere in the graph, are kept whole so that
+        they are computed once and reused """
+        whole = self.value is not None or self.key in cache or self.key in shared
+        if self.op != op or (whole and not top):
+            return [self]
+        return [operand for arg in self.args for operand in arg._chain(op, cache, shared, top=False)]
+
+    def _moments(self):
+        """ (E[X], E[X^2]) from the operands' moments, or None where that needs the full distribution (division
+        and powers). Operands are independent, so E[XY] = E[X]E[Y] and E[(X+Y)^2] = E[X^2] + 2E[X]E[Y] + E[Y^2] """
+        if self.moments is not None:
+            return self.moments or None
+        moments = None
+        if self.op is None:
+            drv = self.evaluate()
+            moments = (drv.expected_value(), np.sum(drv.values ** 2 * drv.probabilities))
+        elif self.op == 'neg':
+            inner = self.args[0]._moments()
+            moments = (-inner[0], inner[1]) if inner else None
+        elif self.op in ('add', 'sub', 'mul'):
+            a, b = self.args[0]._moments(), self.args[1]._moments()
+            if a and b:
+                if self.op == 'mul':
+                    moments = (a[0] * b[0], a[1] * b[1])
+                else:
+                    sign = 1 if self.op == 'add' else -1
+                    moments = (a[0] + sign * b[0], a[1] + b[1] + 2 * sign * a[0] * b[0])
+        self.moments = moments or False
+        return moments
+
+    def expected_value(self):
+        """ E[X], from the operands' moments where possible, else from the materialized distribution """
+        moments = self._moments()
+        return moments[0] if moments else self.evaluate().expected_value()
+
+    def standard_deviation(self):
+        """ The standard deviation, from the operands' moments where possible, else from the materialized
+        distribution. Moments are exact, so they ignore any rebinning the distribution would go through """
+        moments = self._moments()
+        if moments:
+            return np.sqrt(max(moments[1] - moments[0] ** 2, 0.0))
+        return self.evaluate().standard_deviation()
+
+    def quantile(self, q):
+        """ The q-quantile(s) of the materialized distribution """
+        return self.evaluate().quantile(q)
+
+    def sample(self, n=None, rng=None):
+        """ Draws from the materialized distribution, as DRV.sample """
+        return self.evaluate().sample(n, rng)
+
+    def plot(self, **kwargs):
+        """ Plot the materialized distribution, as DRV.plot """
+        self.evaluate().plot(**kwargs)
@@ -7,6 +7,7 @@ Janav Sama
 from drv import DRV
 
 num_samples = 1000
+DRV.max_support = 1000  # rebin products beyond 1000 outcomes, keeping the chain's memory bounded
 
 def main():
     R_star_range = DRV(type='uniform', min_max=(1.5, 3), bins=5)
@@ -18,12 +19,13 @@ def main():
     L_range = DRV(type='normal', mean_std=(10000, 5000), min_max=(0, 1000000), bins=5, num_samples=num_samples)
 
     # Multiplying the distributions
-    N_dist = R_star_range.multiply(fp_range).multiply(ne_range).multiply(fl_range).multiply(fi_range).multiply(
-        fc_range).multiply(L_range)
+    N_dist = R_star_range * fp_range * ne_range * fl_range * fi_range * fc_range * L_range
     N_dist.plot(title='Distribution of N', show_cumulative=True, log_scale=True)
 
     print("Expected Value of N:", N_dist.expected_value())
     print("Standard Deviation of N:", N_dist.standard_deviation())
+    for record in N_dist.rebinned:
+        print("Rebinned {before} -> {after} outcomes ({method}), variance error {relative_variance_error:.3%}".format(**record))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,103 @@
+"""
+File: archive.py
+Description: A streaming Pareto archive for long evolution runs.
+The archive keeps the non-dominated set of every solution offered to it, updating the front one
+solution at a time, and periodically writes it to an uncompressed .npz snapshot. A snapshot can be
+loaded to warm-start a new run or to compare the fronts of several runs.
+"""
+
+import os
+import time
+import numpy as np
+import evo
+
+
+class Archive:
+    """ Incrementally maintained Pareto front of (evaluation, digest) keys and their solutions """
+
+    def __init__(self, path=None, every=300.0):
+        """ path: where snapshots are written (None keeps the archive in memory only)
+        every: seconds between automatic snapshots taken by autosave() """
+        self.path = path
+        self.every = every
+        self.keys = []  # (evaluation, digest) per archived solution
+        self.solutions = []
+        self.scores = np.empty((0, 0))  # one row of objective scores per archived solution
+        self.offered = 0
+        self.saved = time.monotonic()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, key, sol):
+        """ Offer one solution to the archive. It is accepted unless an archived solution dominates it or
+        it is already archived; archived solutions it dominates are dropped. Returns whether it was accepted """
+        self.offered += 1
+        row = evo.Environment._scores([key[0]])[0]
+        if len(self.keys) == 0:
+            self.keys, self.solutions, self.scores = [key], [sol], row[None]
+            return True
+
+        no_worse = (self.scores <= row).all(axis=1)
+        if (no_worse & (self.scores < row).any(axis=1)).any():
+            return False
+        if any(self.keys[i][1] == key[1] for i in np.flatnonzero(no_worse)):
+            return False  # an equal-scoring archived solution with the same content
+
+        survivors = ~((row <= self.scores).all(axis=1) & (row < self.scores).any(axis=1))
+        if not survivors.all():
+            kept = np.flatnonzero(survivors)
+            self.keys = [self.keys[i] for i in kept]
+            self.solutions = [self.solutions[i] for i in kept]
+            self.scores = self.scores[kept]
+        self.keys.append(key)
+        self.solutions.append(sol)
+        self.scores = np.vstack((self.scores, row))
+        return True
+
+    def items(self):
+        """ The archived (key, solution) pairs """
+        return list(zip(self.keys, self.solutions))
+
+    def autosave(self):
+        """ Write a snapshot if the archive has a path and the last one is older than every seconds """
+        if self.path is not None and time.monotonic() - self.saved >= self.every:
+            self.save()
+
+    def save(self, path=None):
+        """ Write the front to path (default: the archive's own path) as an .npz file holding the objective
+        names, the score matrix and the solutions: packed rows for Assignments, else the arrays themselves.
+        The file is written next to the target and renamed, so an interrupted save never leaves a torn snapshot """
+        path = path or self.path
+        names = [name for name, _ in self.keys[0][0]] if self.keys else []
+        state = {'objectives': np.array(names), 'scores': self.scores}
+        if self.solutions and all(hasattr(sol, 'bits') for sol in self.solutions):
+            state['bits'] = np.stack([sol.bits for sol in self.solutions])
+        else:
+            state['solutions'] = np.stack([np.asarray(sol) for sol in self.solutions]) if self.solutions else np.empty(0)
+
+        partial = path + '.partial.npz'
+        np.savez(partial, **state)
+        os.replace(partial, path)
+        self.saved = time.monotonic()
+
+    @staticmethod
+    def load(path, problem=None, every=300.0):
+        """ Read a snapshot back into an Archive that keeps saving to the same path. Packed rows are
+        rebuilt into Assignments of problem, which is required when the snapshot holds them """
+        archive = Archive(path, every)
+        with np.load(path) as state:
+            if 'bits' in state:
+                if problem is None:
+                    raise ValueError(f"{path} holds packed assignments: pass the Problem they belong to")
+                solutions = [problem.packed(bits) for bits in state['bits']]
+            else:
+                solutions = list(state['solutions'])
+            names = [str(name) for name in state['objectives']]
+            scores = state['scores'].tolist()
+
+        for sol, row in zip(solutions, scores):
+            evaluation = sol.evaluation() if hasattr(sol, 'evaluation') else tuple(zip(names, row))
+            archive.add((evaluation, evo.digest(sol)), sol)
+        archive.offered = 0
+        return archive
@@ -0,0 +1,134 @@
+"""
+File: benchmark.py
+Description: Benchmark of the evolver on synthetic instances of increasing size.
+For every (TAs, sections) size it reports batch evaluations per second, incremental mutations and
+crossovers per second, the time of one remove_dominated over a population, and the memory of that
+population. Results are written as JSON tagged with the git commit, and two result files can be
+compared size by size to see what a change did.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+import numpy as np
+from evo import Environment
+from function_agents import Problem, Agents
+import synthetic
+
+SIZES = ((43, 17), (200, 100), (1000, 500), (2000, 2000), (5000, 2000))
+
+
+def rate(f, seconds):
+    """ Calls of f per second, calling it repeatedly for at least the given number of seconds """
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        f()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds:
+            return calls / elapsed
+
+
+def measure(tas, sections, population=100, seconds=1.0, seed=0):
+    """ Benchmark one instance size, returning a dict of results """
+    problem = Problem(*synthetic.make_instance(tas, sections, seed=seed))
+    np.random.seed(seed)
+    result = {'tas': tas, 'sections': sections, 'population': population}
+
+    # Batch evaluation of unpacked matrices, in batches of at most ~20M cells
+    batch = int(max(1, min(64, 2e7 // (tas * sections))))
+    matrices = np.random.randint(2, size=(batch, tas, sections))
+    result['evaluations_per_sec'] = batch * rate(lambda: problem.evaluate(matrices), seconds)
+    del matrices
+
+    # Population of packed assignments, and its memory
+    tracemalloc.start()
+    E = Environment()
+    E.set_evaluator(problem.objectives, problem.evaluate)
+    E.add_agent('mutate', Agents.mutate, k=1)
+    E.add_solutions([problem.random_assignment() for _ in range(population)])
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    result['population_bytes'] = current
+    result['bytes_per_solution'] = current / population
+
+    solutions = list(E.pop.values())
+    result['mutations_per_sec'] = rate(lambda: Agents.mutate(solutions[:1]), seconds)
+    result['crossovers_per_sec'] = rate(lambda: Agents.crossover(solutions[:2]), seconds)
+
+    # Offspring so that the filter has something to remove, then one timed filter
+    for _ in range(population):
+        E.run_agent('mutate')
+    start = time.perf_counter()
+    E.remove_dominated()
+    result['remove_dominated_seconds'] = time.perf_counter() - start
+    result['front'] = E.size()
+    return result
+
+
+def commit():
+    """ The current git commit, with a + when the working tree has uncommitted changes """
+    try:
+        head = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True)
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True, text=True)
+        return head.stdout.strip() + ('+' if dirty.stdout.strip() else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run(sizes=SIZES, population=100, seconds=1.0, seed=0):
+    """ Benchmark every size, returning the results with the commit and platform they were measured on """
+    return {'commit': commit(), 'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': platform.python_version(),
+            'numpy': np.__version__, 'machine': platform.machine(),
+            'results': [measure(tas, sections, population, seconds, seed) for tas, sections in sizes]}
+
+
+def compare(before, after):
+    """ Text table of the ratio after / before of every metric, for the sizes found in both runs """
+    metrics = ('evaluations_per_sec', 'mutations_per_sec', 'crossovers_per_sec', 'remove_dominated_seconds',
+               'bytes_per_solution')
+    old = {(r['tas'], r['sections']): r for r in before['results']}
+    lines = [f"{before['commit']} -> {after['commit']} (ratio after / before)",
+             f"{'size':<12}" + ''.join(f"{m:>26}" for m in metrics)]
+    for r in after['results']:
+        size = (r['tas'], r['sections'])
+        if size in old:
+            ratios = [r[m] / old[size][m] if old[size][m] else float('nan') for m in metrics]
+            label = f"{r['tas']}x{r['sections']}"
+            lines.append(f"{label:<12}" + ''.join(f"{x:>26.3f}" for x in ratios))
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the evolver on synthetic instances')
+    parser.add_argument('-s', '--sizes', nargs='+', default=None,
+                        help='Instance sizes as TASxSECTIONS, e.g., 1000x500 (default: a ladder up to 5000x2000)')
+    parser.add_argument('-p', '--population', type=int, default=100, help='Population size at every size')
+    parser.add_argument('-t', '--seconds', type=float, default=1.0, help='Seconds to spend on each rate')
+    parser.add_argument('-o', '--output', default=None, help='JSON file to write the results to')
+    parser.add_argument('-c', '--compare', nargs=2, metavar=('BEFORE', 'AFTER'), default=None,
+                        help='Compare two result files instead of benchmarking')
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f, open(args.compare[1]) as g:
+            print(compare(json.load(f), json.load(g)))
+        return
+
+    sizes = [tuple(int(n) for n in size.split('x')) for size in args.sizes] if args.sizes else SIZES
+    report = run(sizes, args.population, args.seconds)
+    for r in report['results']:
+        print(f"{r['tas']}x{r['sections']}: {r['evaluations_per_sec']:.0f} evals/s, "
+              f"{r['mutations_per_sec']:.0f} mutations/s, {r['crossovers_per_sec']:.0f} crossovers/s, "
+              f"remove_dominated {r['remove_dominated_seconds']:.4f} s, {r['bytes_per_solution']:.0f} bytes/solution")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=1)
+
+
+if __name__ == '__main__':
+    main()
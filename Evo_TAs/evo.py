@@ -1,17 +1,177 @@
+import hashlib
 import numpy as np
 import pandas as pd
 import random as rnd
 import copy
-from functools import reduce
 import time
 
 
+def _dominated_by(points, others):
+    """ For each row of points, whether any row of others dominates it (all objectives minimized) """
+    no_worse = np.ones((len(points), len(others)), dtype=bool)
+    equal = np.ones((len(points), len(others)), dtype=bool)
+    for j in range(points.shape[1]):
+        no_worse &= others[:, j] <= points[:, j, None]
+        equal &= others[:, j] == points[:, j, None]
+    return (no_worse & ~equal).any(axis=1)
+
+
+def nondominated(scores, chunk=128):
+    """ Boolean mask of the rows of an (n, m) score matrix that no other row dominates.
+    Rows are visited in order of their score sums, because a row can only be dominated by rows with a
+    smaller sum. Each chunk is tested against the front found so far and against itself in one
+    vectorized step, so the cost grows with n * front size rather than n ** 2 """
+    scores = np.asarray(scores, dtype=float)
+    keep = np.zeros(len(scores), dtype=bool)
+    if len(scores) == 0:
+        return keep
+
+    order = np.argsort(scores.sum(axis=1), kind='stable')
+    front = np.empty((0, scores.shape[1]))
+    for start in range(0, len(order), chunk):
+        rows = order[start:start + chunk]
+        block = scores[rows]
+        dominated = _dominated_by(block, front) | _dominated_by(block, block)
+        keep[rows[~dominated]] = True
+        front = np.vstack((front, block[~dominated]))
+    return keep
+
+
+def pareto_ranks(scores):
+    """ Pareto rank of every row of an (n, m) score matrix: 0 for the non-dominated front, 1 for the
+    front left once rank 0 is removed, and so on """
+    scores = np.asarray(scores, dtype=float)
+    ranks = np.zeros(len(scores), dtype=int)
+    remaining = np.arange(len(scores))
+    rank = 0
+    while len(remaining) > 0:
+        front = nondominated(scores[remaining])
+        ranks[remaining[front]] = rank
+        remaining = remaining[~front]
+        rank += 1
+    return ranks
+
+
+def crowding_distance(scores):
+    """ NSGA-II crowding distance of every row of an (n, m) score matrix: how far apart its neighbours
+    are along each objective, with the extreme rows at infinity """
+    scores = np.asarray(scores, dtype=float)
+    distance = np.zeros(len(scores))
+    if len(scores) < 3:
+        distance[:] = np.inf
+        return distance
+    for j in range(scores.shape[1]):
+        order = np.argsort(scores[:, j], kind='stable')
+        column = scores[order, j]
+        distance[order[[0, -1]]] = np.inf
+        span = column[-1] - column[0]
+        if span > 0:
+            distance[order[1:-1]] += (column[2:] - column[:-2]) / span
+    return distance
+
+
+def digest(sol):
+    """ Content hash of a solution: its own digest if it keeps one, else a hash of the array's bytes """
+    if hasattr(sol, 'digest'):
+        return sol.digest
+    sol = np.ascontiguousarray(sol)
+    return hashlib.blake2b(sol.tobytes() + str(sol.shape).encode(), digest_size=16).digest()
+
+
+# Selection strategies: pick k keys out of the population's (evaluation, digest) keys
+def select_uniform(keys, k):
+    """ k distinct keys drawn uniformly at random """
+    return rnd.sample(keys, k)
+
+
+def select_tournament(keys, k, size=2):
+    """ k binary (or size-way) tournaments: a contestant that dominates the others wins,
+    otherwise the first contestant drawn does """
+    winners = []
+    for _ in range(k):
+        contestants = rnd.sample(keys, min(size, len(keys)))
+        winner = contestants[0]
+        for q in contestants[1:]:
+            if Environment._dominates(q[0], winner[0]):
+                winner = q
+        winners.append(winner)
+    return winners
+
+
+def select_crowding(keys, k):
+    """ k binary tournaments won by the contestant in the less crowded part of the objective space,
+    which keeps the selected parents spread along the front """
+    distance = crowding_distance(Environment._scores([e for e, _ in keys]))
+    picks = []
+    for _ in range(k):
+        i, j = rnd.sample(range(len(keys)), 2) if len(keys) > 1 else (0, 0)
+        picks.append(keys[i] if distance[i] >= distance[j] else keys[j])
+    return picks
+
+
+SELECTIONS = {'uniform': select_uniform, 'tournament': select_tournament, 'crowding': select_crowding}
+
+
+class AdaptiveScheduler:
+    """ Chooses which agent to run next by probability matching on the agents' recent success: each
+    offspring that survives the next domination filter rewards its agent with 1, any other offspring
+    with 0, and agents are picked in proportion to their exponentially decayed mean reward. Every agent
+    keeps at least a floor probability so that an agent that is unlucky early can recover """
+
+    def __init__(self, decay=0.99, floor=0.05):
+        """ decay: weight of an agent's previous success rate when a new reward arrives
+        floor: minimum probability of picking any agent """
+        self.decay = decay
+        self.floor = floor
+        self.success = {}  # agent name -> decayed mean reward, starting optimistic at 1
+        self.probabilities = None  # cached (names, probabilities), recomputed after new rewards
+
+    def register(self, names):
+        """ Make sure every agent name has a success rate """
+        for name in names:
+            self.success.setdefault(name, 1.0)
+        self.probabilities = None
+
+    def weights(self):
+        """ The learned probability of picking each agent """
+        names = list(self.success)
+        floor = min(self.floor, 1 / len(names))
+        total = sum(self.success.values())
+        return {name: floor + (1 - len(names) * floor) * (self.success[name] / total if total > 0 else 1 / len(names))
+                for name in names}
+
+    def choose(self):
+        """ The name of the agent to run next """
+        if self.probabilities is None:
+            weights = self.weights()
+            self.probabilities = (list(weights), list(weights.values()))
+        names, probabilities = self.probabilities
+        return rnd.choices(names, probabilities)[0]
+
+    def credit(self, name, reward):
+        """ Fold one offspring's reward (1 if it entered the non-dominated set, else 0) into its agent's rate """
+        self.success[name] = self.decay * self.success[name] + (1 - self.decay) * reward
+        self.probabilities = None
+
+
+SCHEDULERS = {'adaptive': AdaptiveScheduler}
+
+
 class Environment:
-    def __init__(self):
+    def __init__(self, selection='uniform', scheduler=None):
         """ Environment constructor """
-        self.pop = {}  # evaluation -> solution e.g.,  ((conflicts, 5), (undersupport, 3), ...) --> TA assignments
+        # (evaluation, digest) -> solution e.g.,  (((conflicts, 5), (undersupport, 3), ...), b'...') --> TA assignments
+        # Keying on the content digest as well keeps distinct solutions with equal scores, and stores each solution once
+        self.pop = {}
         self.fitness = {}  # objectives / fitness functions:   name->f
         self.agents = {}  # agents:   name -> (operator/function, num_solutions_input)
+        self.evaluator = None  # optional batch scorer: (objective names, f(stacked solutions) -> score rows)
+        self.selection = None  # how agents' input solutions are drawn: f(keys, k) -> k keys
+        self.archive = None  # optional archive.Archive offered every solution added to the population
+        self.observers = []  # callables notified with a telemetry record every status iterations of evolve
+        self.scheduler = None  # optional object choosing the next agent from their success; None picks uniformly
+        self.set_selection(selection)
+        self.set_scheduler(scheduler)
 
     def size(self):
         """ The size of the current population """
@@ -21,36 +181,99 @@ class Environment:
         """ Add or declare an objective to the framework """
         self.fitness[name] = f
 
+    def set_evaluator(self, names, f):
+        """ Score solutions with one vectorized call instead of the registered fitness functions.
+        f maps a stacked array of solutions to an array with one row of scores per solution,
+        one column per objective in the order of names """
+        self.evaluator = (tuple(names), f)
+
+    def evaluate(self, sols):
+        """ Evaluations of a list of solutions, e.g., ((conflicts, 5), (undersupport, 3), ...) each """
+        if self.evaluator is not None:
+            names, f = self.evaluator
+            return [tuple(zip(names, scores)) for scores in f(np.stack(sols)).tolist()]
+        return [tuple([(name, f(sol)) for name, f in self.fitness.items()]) for sol in sols]
+
+    def set_selection(self, selection):
+        """ Choose how agents' input solutions are picked from the population: 'uniform', 'tournament',
+        'crowding', or any function f(keys, k) returning k of the population's (evaluation, digest) keys """
+        self.selection = SELECTIONS[selection] if isinstance(selection, str) else selection
+
+    def set_scheduler(self, scheduler):
+        """ Choose how evolve picks the next agent: None for uniformly at random followed by a crossover,
+        'adaptive' for an AdaptiveScheduler, or any object with register(names), choose() and
+        credit(name, reward) methods. The scheduler's learned weights are available from scheduler.weights() """
+        self.scheduler = SCHEDULERS[scheduler]() if isinstance(scheduler, str) else scheduler
+
     def add_agent(self, name, op, k=1):
         """ Register a named agent with the framework
         The operator (op) function defines what the agent does.
         k defines the number of input solutions that the agent operates on """
         self.agents[name] = (op, k)
 
+    def attach_archive(self, archive, warm_start=False):
+        """ Offer every solution added from now on to archive, which keeps the Pareto front of the whole run.
+        With warm_start=True the archived solutions are first added to the population, to resume a run """
+        self.archive = archive
+        if warm_start:
+            for key, sol in archive.items():
+                self.pop[key] = sol
+
+    def add_observer(self, observer):
+        """ Register a callable observer(environment, record) called every status iterations of evolve with
+        a telemetry record: iteration, elapsed seconds, population size, and per agent the number of calls,
+        offspring evaluated per second and the fraction of offspring that survived domination.
+        With no observers, evolve collects no telemetry """
+        self.observers.append(observer)
+
+    def remove_observer(self, observer):
+        """ Stop notifying an observer """
+        self.observers.remove(observer)
+
+    def _store(self, key, sol):
+        """ Put a solution in the population under its (evaluation, digest) key, and in the archive if any """
+        self.pop[key] = sol
+        if self.archive is not None:
+            self.archive.add(key, sol)
+        return key
+
     def add_solution(self, sol):
-        """ Evaluate and Add a solution to the population """
+        """ Evaluate and Add a solution to the population, returning its key (None if it was skipped) """
         if sol is not None:
-            if isinstance(sol, np.ndarray):
-                eval = tuple([(name, f(sol)) for name, f in self.fitness.items()])
-                self.pop[eval] = sol
+            if hasattr(sol, 'evaluation'):  # the solution keeps its own scores up to date
+                return self._store((sol.evaluation(), digest(sol)), sol)
+            elif isinstance(sol, np.ndarray):
+                eval = self.evaluate([sol])[0]
+                return self._store((eval, digest(sol)), sol)
             else:
                 print("Warning: Attempted to add a non-NumPy array solution. Skipping.")
         else:
             print("Warning: Attempted to add a None solution. Skipping.")
 
-    def generate_random_solution(self):
-        num_sections = len(sections_df)
-        num_tas = len(tas_df)
-        # Generate a random solution where each cell represents whether a TA is assigned to a section
-        random_solution = np.random.randint(2, size=(num_sections, num_tas))
-        return random_solution
+    def add_solutions(self, sols):
+        """ Evaluate a batch of NumPy array solutions together and add them to the population """
+        for sol in sols:
+            if hasattr(sol, 'evaluation'):
+                self._store((sol.evaluation(), digest(sol)), sol)
+        sols = [sol for sol in sols if isinstance(sol, np.ndarray)]
+        if sols:
+            for eval, sol in zip(self.evaluate(sols), sols):
+                self._store((eval, digest(sol)), sol)
+
+    def get_random_solutions(self, k=1):
+        """ Pick k solutions from the population with the current selection strategy.
+        Agents must not modify them: they are the population's own solutions, not copies """
+        if self.size() < k:
+            return []
+        return [self.pop[key] for key in self.selection(list(self.pop.keys()), k)]
 
     def run_agent(self, name):
-        """ Invoke an agent against the population """
+        """ Invoke an agent against k solutions selected from the population, returning the key of its
+        offspring (None if the agent did not run or produced nothing) """
         op, k = self.agents[name]
-        pick = self.generate_random_solution()
-        new_solution = op(pick)
-        self.add_solution(new_solution)
+        picks = self.get_random_solutions(k)
+        if len(picks) == k:
+            return self.add_solution(op(picks))
 
     @staticmethod
     def _dominates(p, q):
@@ -63,31 +286,98 @@ class Environment:
         return min_diff >= 0.0 and max_diff > 0.0
 
     @staticmethod
-    def _reduce_nds(S, p):
-        return S - {q for q in S if Environment._dominates(p, q)}
+    def _scores(evals):
+        """ Objective matrix of a list of evaluations, one row per evaluation """
+        return np.array([[score for _, score in e] for e in evals], dtype=float).reshape(len(evals), -1)
+
+    def evaluations(self):
+        """ The evaluation of every solution in the population, in population order """
+        return [e for e, _ in self.pop]
 
     def remove_dominated(self):
-        nds = reduce(Environment._reduce_nds, self.pop.keys(), self.pop.keys())
-        self.pop = {k: self.pop[k] for k in nds}
+        """ Keep only the non-dominated solutions """
+        keys = list(self.pop.keys())
+        keep = nondominated(Environment._scores([e for e, _ in keys]))
+        self.pop = {key: self.pop[key] for key, k in zip(keys, keep) if k}
+
+    def fronts(self):
+        """ The population's evaluations split into Pareto rank layers, best layer first """
+        evals = self.evaluations()
+        ranks = pareto_ranks(Environment._scores(evals))
+        layers = [[] for _ in range(ranks.max() + 1)] if len(ranks) else []
+        for e, rank in zip(evals, ranks):
+            layers[rank].append(e)
+        return layers
 
     def evolve(self, n=1, dom=100, status=100, time_limit=600):
+        """ Run n agent invocations (or until time_limit seconds pass), filtering the population down to its
+        non-dominated solutions every dom iterations and notifying the observers every status iterations """
         agent_names = list(self.agents.keys())
         start_time = time.time()
+        stats = {name: {'calls': 0, 'seconds': 0.0, 'offspring': 0, 'judged': 0, 'survived': 0}
+                 for name in agent_names}
+        pending = []  # (agent, key) of offspring that have not been through a domination filter yet
+        if self.scheduler is not None:
+            self.scheduler.register(agent_names)
+        i = 0
         for i in range(n):
-            pick = rnd.choice(agent_names)
-            self.run_agent(pick)
+            pick = self.scheduler.choose() if self.scheduler is not None else rnd.choice(agent_names)
+            self._step(pick, stats, pending)
             if i % dom == 0:
-                self.remove_dominated()
-            if i % status == 0:
-                print("Iteration:", i)
-                print("Population Size:", self.size())
+                self._filter(stats, pending)
+                if self.archive is not None:
+                    self.archive.autosave()
+            if i % status == 0 and self.observers:
+                self._report(i, start_time, stats)
             if time.time() - start_time >= time_limit:
-                print("Time limit reached. Exiting evolution process.")
                 break
 
-            # Ensure at least two solutions are available for crossover
-            if self.size() >= 2:
-                self.run_agent("crossover")  # Only run crossover if there are at least two solutions
+            # Without a scheduler, also run a crossover whenever at least two solutions are available
+            if self.scheduler is None and self.size() >= 2:
+                self._step("crossover", stats, pending)  # Only run crossover if there are at least two solutions
 
         # cleaning up the population on the last iteration
+        self._filter(stats, pending)
+        if self.observers:
+            self._report(i, start_time, stats)
+        if self.archive is not None and self.archive.path is not None:
+            self.archive.save()
+
+    def _step(self, name, stats, pending):
+        """ Run one agent, timing it and remembering its offspring when the run is observed or scheduled """
+        if not self.observers and self.scheduler is None:
+            self.run_agent(name)
+            return
+        start = time.perf_counter()
+        key = self.run_agent(name)
+        agent = stats[name]
+        agent['seconds'] += time.perf_counter() - start
+        agent['calls'] += 1
+        if key is not None:
+            agent['offspring'] += 1
+            pending.append((name, key))
+        elif self.scheduler is not None:
+            self.scheduler.credit(name, 0)
+
+    def _filter(self, stats, pending):
+        """ remove_dominated, crediting each agent with the offspring that survived it """
         self.remove_dominated()
+        for name, key in pending:
+            survived = key in self.pop
+            stats[name]['judged'] += 1
+            stats[name]['survived'] += survived
+            if self.scheduler is not None:
+                self.scheduler.credit(name, int(survived))
+        pending.clear()
+
+    def _report(self, iteration, start_time, stats):
+        """ Send a telemetry record to every observer """
+        record = {'iteration': iteration, 'elapsed': time.time() - start_time, 'size': self.size(), 'agents': {
+            name: {'calls': agent['calls'],
+                   'evals_per_sec': agent['offspring'] / agent['seconds'] if agent['seconds'] else 0.0,
+                   'acceptance': agent['survived'] / agent['judged'] if agent['judged'] else 0.0}
+            for name, agent in stats.items()}}
+        if self.scheduler is not None:
+            record['weights'] = self.scheduler.weights()
+        for observer in self.observers:
+            observer(self, record)
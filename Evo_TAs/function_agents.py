@@ -1,67 +1,210 @@
+import hashlib
 import numpy as np
 import pandas as pd
 import random as rnd
-import copy
 
 tas_df = pd.read_csv("tas.csv")
 sections_df = pd.read_csv("sections.csv")
 
+POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)  # set bits per byte value
+
+
+class Problem:
+    """ The TA assignment problem compiled once from the data frames: preference masks and capacity
+    vectors are built up front, and every objective accepts one (tas, sections) solution or a stacked
+    batch of shape (n, tas, sections) """
+    objectives = ('conflicts', 'undersupport', 'unwilling', 'unpreferred', 'overallocation')
+
+    def __init__(self, tas, sections):
+        preferences = tas.iloc[:, 3:].values  # one column per section after ta_id, name, max_assigned
+        self.shape = preferences.shape
+        self.max_assigned = tas['max_assigned'].values
+        self.min_ta = sections['min_ta'].values
+        self.unwilling_mask = (preferences == 'U').astype(int)
+        self.unpreferred_mask = (preferences == 'W').astype(int)  # willing, but not preferred
+        self.unwilling_bits = np.packbits(self.unwilling_mask, axis=1)
+        self.unpreferred_bits = np.packbits(self.unpreferred_mask, axis=1)
+
+    def overallocation(self, solutions, ta_load=None):
+        """ Labs assigned to each TA beyond their max_assigned, summed over TAs """
+        ta_load = np.sum(solutions, axis=-1) if ta_load is None else ta_load
+        return np.maximum(0, ta_load - self.max_assigned).sum(axis=-1)
+
+    def conflicts(self, solutions, section_load=None):
+        """ Number of sections with more than one TA assigned """
+        section_load = np.sum(solutions, axis=-2) if section_load is None else section_load
+        return (section_load > 1).sum(axis=-1)
+
+    def undersupport(self, solutions, section_load=None):
+        """ Twice the number of TAs each section is short of its min_ta, summed over sections """
+        section_load = np.sum(solutions, axis=-2) if section_load is None else section_load
+        return (np.maximum(0, self.min_ta - section_load) * 2).sum(axis=-1)
+
+    def unwilling(self, solutions):
+        """ Number of assignments to sections the TA marked unwilling """
+        return (solutions * self.unwilling_mask).sum(axis=(-2, -1))
+
+    def unpreferred(self, solutions):
+        """ Number of assignments to sections the TA is willing to take but did not prefer """
+        return (solutions * self.unpreferred_mask).sum(axis=(-2, -1))
+
+    def evaluate(self, solutions):
+        """ Score a stacked batch of solutions in one pass: an (n, 5) array with one column per objective,
+        in the order of Problem.objectives """
+        solutions = np.asarray(solutions)
+        flat = solutions.reshape(len(solutions), -1)
+        ta_load = solutions.sum(axis=2)
+        section_load = solutions.sum(axis=1)
+        return np.column_stack((self.conflicts(solutions, section_load),
+                                self.undersupport(solutions, section_load),
+                                flat @ self.unwilling_mask.ravel(),
+                                flat @ self.unpreferred_mask.ravel(),
+                                self.overallocation(solutions, ta_load)))
+
+    def assignment(self, matrix):
+        """ Wrap a (tas, sections) 0/1 matrix as a bit-packed Assignment """
+        return self.packed(np.packbits(np.asarray(matrix, dtype=np.uint8), axis=1))
+
+    def packed(self, bits):
+        """ Wrap the packed rows of a solution (np.packbits(matrix, axis=1)) as an Assignment, computing
+        its loads and scores once with popcounts, without unpacking the matrix """
+        ta_load = POPCOUNT[bits].sum(axis=1)
+        # Column sums: count bit b of every byte down the TAs, then interleave back into section order
+        section_load = np.stack([((bits >> (7 - b)) & 1).sum(axis=0) for b in range(8)], axis=1).ravel()
+        section_load = section_load[:self.shape[1]]
+        scores = [int(self.conflicts(None, section_load)),
+                  int(self.undersupport(None, section_load)),
+                  int(POPCOUNT[bits & self.unwilling_bits].sum()),
+                  int(POPCOUNT[bits & self.unpreferred_bits].sum()),
+                  int(self.overallocation(None, ta_load))]
+        return Assignment(self, bits, ta_load.astype(np.int16), section_load.astype(np.int16), scores)
+
+    def random_assignment(self):
+        """ An Assignment with every cell drawn at random, for seeding the population """
+        return self.assignment(np.random.randint(2, size=self.shape))
+
+
+class Assignment:
+    """ A solution stored as bit-packed rows (8 cells per byte) that carries its row sums (labs per TA),
+    column sums (TAs per section), objective scores and a digest of its content. Flipping one cell
+    updates every objective in O(1), and two assignments are equal when their cells are """
+    __slots__ = ('problem', 'bits', 'ta_load', 'section_load', 'scores', 'digest')
+
+    def __init__(self, problem, bits, ta_load, section_load, scores):
+        self.problem = problem
+        self.bits = bits
+        self.ta_load = ta_load
+        self.section_load = section_load
+        self.scores = scores  # in the order of Problem.objectives
+        self.digest = hashlib.blake2b(bits.tobytes(), digest_size=16).digest()
+
+    def __len__(self):
+        return len(self.bits)
+
+    def __eq__(self, other):
+        return isinstance(other, Assignment) and self.digest == other.digest
+
+    def __hash__(self):
+        return hash(self.digest)
+
+    @property
+    def matrix(self):
+        """ The unpacked (tas, sections) 0/1 matrix """
+        return np.unpackbits(self.bits, axis=1, count=self.problem.shape[1])
+
+    def evaluation(self):
+        """ The cached scores as an evaluation, e.g., ((conflicts, 5), (undersupport, 3), ...) """
+        return tuple(zip(self.problem.objectives, self.scores))
+
+    def flip(self, ta, section):
+        """ A new Assignment with one cell toggled. The objectives are updated from the changed TA and
+        section loads instead of being recomputed; this assignment is left unchanged """
+        p = self.problem
+        byte, mask = section >> 3, 0x80 >> (section & 7)
+        delta = -1 if self.bits[ta, byte] & mask else 1  # +1 when assigning, -1 when unassigning
+        bits = self.bits.copy()
+        bits[ta, byte] ^= mask
+        ta_load = self.ta_load.copy()
+        section_load = self.section_load.copy()
+        old_ta, old_section = int(ta_load[ta]), int(section_load[section])
+        ta_load[ta] += delta
+        section_load[section] += delta
+        new_ta, new_section = old_ta + delta, old_section + delta
+
+        conflicts, undersupport, unwilling, unpreferred, overallocation = self.scores
+        conflicts += (new_section > 1) - (old_section > 1)
+        undersupport += 2 * (max(0, p.min_ta[section] - new_section) - max(0, p.min_ta[section] - old_section))
+        unwilling += delta * p.unwilling_mask[ta, section]
+        unpreferred += delta * p.unpreferred_mask[ta, section]
+        overallocation += max(0, new_ta - p.max_assigned[ta]) - max(0, old_ta - p.max_assigned[ta])
+        scores = [int(conflicts), int(undersupport), int(unwilling), int(unpreferred), int(overallocation)]
+        return Assignment(p, bits, ta_load, section_load, scores)
+
+
+PROBLEM = Problem(tas_df, sections_df)
+
 
 # Define objective functions
 def overallocation(solution):
-    max_assigned_tas = tas_df['max_assigned'].values
-    num_assigned_labs = np.sum(solution, axis=1)
-    overallocation_penalty = np.maximum(0, num_assigned_labs - max_assigned_tas)
-    return np.sum(overallocation_penalty)
+    return PROBLEM.overallocation(solution)
 
 
 def conflicts(solution):
-    return np.sum(np.sum(solution, axis=0) > 1)
+    return PROBLEM.conflicts(solution)
 
 
 def undersupport(solution):
-    min_required_tas = sections_df['min_ta'].values
-    num_assigned_tas = np.sum(solution, axis=1)
-    penalty = np.maximum(0, min_required_tas - num_assigned_tas) * 2
-    return np.sum(penalty)
+    return PROBLEM.undersupport(solution)
+
 
 def unwilling(solution):
-    unwilling_mask = (tas_df.iloc[:, 2:] == 'U').values
-    return np.sum(solution & unwilling_mask)
+    return PROBLEM.unwilling(solution)
 
 
 def unpreferred(solution):
-    willing_mask = (tas_df.iloc[:, 2:] == 'W').values
-    preferred_mask = (tas_df.iloc[:, 2:] == 'P').values
-    unpreferred_mask = willing_mask & ~preferred_mask
-    return np.sum(solution & unpreferred_mask)
+    return PROBLEM.unpreferred(solution)
 
 
 # Define agents for mutation and crossover
+# Agents receive a list of k solutions taken straight from the population. They never modify those
+# solutions: every operator builds its offspring as a new array, so no defensive copies are needed.
 class Agents:
     @staticmethod
-    def mutate(solution):
-        """Mutate a solution by randomly changing one or more elements."""
+    def mutate(solutions):
+        """Mutate a solution by toggling one random assignment."""
+        solution = solutions[0]
         if solution is None or len(solution) == 0:
             return None
 
-        mutated_solution = copy.deepcopy(solution)
-        section_index = rnd.randint(0, len(mutated_solution) - 1)
-        ta_index = rnd.randint(0, len(mutated_solution[section_index]) - 1)
-        mutated_solution[section_index][ta_index] = 1 - mutated_solution[section_index][ta_index]  # Toggle assignment
+        shape = solution.problem.shape if isinstance(solution, Assignment) else solution.shape
+        ta_index = rnd.randrange(shape[0])
+        section_index = rnd.randrange(shape[1])
+        if isinstance(solution, Assignment):
+            return solution.flip(ta_index, section_index)
+
+        mutated_solution = solution.copy()
+        mutated_solution[ta_index, section_index] = 1 - mutated_solution[ta_index, section_index]
         return mutated_solution
 
     @staticmethod
     def crossover(solutions):
         """Perform crossover operation on two solutions to create a new one."""
-        if len(solutions) < 2 or not all(solutions):
+        if len(solutions) < 2 or any(s is None or len(s) == 0 for s in solutions):
             return None
 
-        min_length = min(len(solutions[0]), len(solutions[1]))
-        parent1 = solutions[0][:min_length]
-        parent2 = solutions[1][:min_length]
+        parent1, parent2 = solutions[:2]
+        if isinstance(parent1, Assignment) and isinstance(parent2, Assignment):
+            rows1, rows2 = parent1.bits, parent2.bits  # whole rows can be spliced without unpacking
+        else:
+            rows1 = parent1.matrix if isinstance(parent1, Assignment) else parent1
+            rows2 = parent2.matrix if isinstance(parent2, Assignment) else parent2
+        min_length = min(len(rows1), len(rows2))
 
-        # Combine two solutions by taking half from each
+        # Combine two solutions by taking half of the TAs' rows from each
         crossover_point = min_length // 2
-        new_solution = parent1[:crossover_point] + parent2[crossover_point:]
+        new_solution = np.concatenate((rows1[:crossover_point], rows2[crossover_point:min_length]))
+        if isinstance(parent1, Assignment) and isinstance(parent2, Assignment):
+            return parent1.problem.packed(new_solution)
+        if isinstance(parent1, Assignment):
+            return parent1.problem.assignment(new_solution)
         return new_solution
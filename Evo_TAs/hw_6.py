@@ -43,8 +43,6 @@ class Environment:
             if isinstance(sol, np.ndarray):
                 eval = tuple([(name, f(sol)) for name, f in self.fitness.items()])
                 self.pop[eval] = sol
-                print("Added solution to population:", sol)
-                print("Population after adding solution:", self.pop)
             else:
                 print("Warning: Attempted to add a non-NumPy array solution. Skipping.")
         else:
@@ -55,7 +53,6 @@ class Environment:
         num_tas = len(tas_df)
         # Generate a random solution where each cell represents whether a TA is assigned to a section
         random_solution = np.random.randint(2, size=(num_sections, num_tas))
-        print("Generated random solution:", random_solution)
         return random_solution
 
     def run_agent(self, name):
@@ -94,14 +91,12 @@ class Environment:
             if i % status == 0:
                 print("Iteration:", i)
                 print("Population Size:", self.size())
-                print(self)
             if time.time() - start_time >= time_limit:
                 print("Time limit reached. Exiting evolution process.")
                 break
 
             # Ensure at least two solutions are available for crossover
             if self.size() >= 2:
-                print("Performing crossover")
                 self.run_agent("crossover")  # Only run crossover if there are at least two solutions
 
         # cleaning up the population on the last iteration
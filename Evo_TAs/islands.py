@@ -0,0 +1,159 @@
+"""
+File: islands.py
+Description: Island-model evolution across processes.
+Several Environments evolve in parallel worker processes. After every epoch each island sends
+a sample of its non-dominated solutions to its neighbours in the migration topology, and at the
+end all island fronts are merged into a single Pareto front.
+"""
+
+import argparse
+import os
+import queue
+import random as rnd
+import traceback
+from multiprocessing import Process, Queue
+import numpy as np
+
+
+def ring(index, islands):
+    """ Each island sends migrants to the next one """
+    return [(index + 1) % islands]
+
+
+def fully_connected(index, islands):
+    """ Each island sends migrants to every other island """
+    return [j for j in range(islands) if j != index]
+
+
+def random_neighbour(index, islands):
+    """ Each island sends migrants to one other island chosen anew every epoch """
+    return [rnd.choice([j for j in range(islands) if j != index])] if islands > 1 else []
+
+
+TOPOLOGIES = {'ring': ring, 'full': fully_connected, 'random': random_neighbour}
+
+
+def _island(index, build, seed, epochs, interval, migrants, topology, inboxes, status, results):
+    """ Worker process: evolve one island, exchanging migrants between epochs. An exception is reported
+    to the parent as a status record with the traceback before the worker exits """
+    try:
+        _evolve_island(index, build, seed, epochs, interval, migrants, topology, inboxes, status, results)
+    except Exception:
+        status.put({'island': index, 'error': traceback.format_exc()})
+        raise
+
+
+def _evolve_island(index, build, seed, epochs, interval, migrants, topology, inboxes, status, results):
+    rnd.seed(seed)
+    np.random.seed(seed)
+    E = build()
+    inbox = inboxes[index]
+
+    for epoch in range(epochs):
+        E.evolve(n=10 ** 12, time_limit=interval)
+
+        arrived = 0
+        while True:
+            try:
+                newcomers = inbox.get_nowait()
+            except queue.Empty:
+                break
+            E.add_solutions(newcomers)
+            arrived += len(newcomers)
+        E.remove_dominated()
+
+        if epoch < epochs - 1:
+            front = list(E.pop.values())
+            for target in topology(index, len(inboxes)):
+                inboxes[target].put(rnd.sample(front, min(migrants, len(front))))
+
+        scores = E._scores(E.evaluations())
+        status.put({'island': index, 'epoch': epoch, 'size': E.size(), 'arrived': arrived,
+                    'best': scores.min(axis=0).tolist() if len(scores) else []})
+
+    results.put((index, list(E.pop.values())))
+    # Migrants still queued for islands that already finished are not needed, so don't wait to flush them
+    for q in inboxes:
+        q.cancel_join_thread()
+
+
+def _receive(q, workers):
+    """ The next item of q, raising RuntimeError if an island failed instead of waiting for it forever """
+    while True:
+        try:
+            item = q.get(timeout=1.0)
+        except queue.Empty:
+            failed = [i for i, worker in enumerate(workers) if worker.exitcode not in (None, 0)]
+            if failed:
+                raise RuntimeError(f"island {failed[0]} exited with code {workers[failed[0]].exitcode}")
+            continue
+        if isinstance(item, dict) and 'error' in item:
+            raise RuntimeError(f"island {item['island']} failed:\n{item['error']}")
+        return item
+
+
+def evolve_islands(build, islands=None, epochs=10, interval=10.0, migrants=5, topology='ring', seed=0,
+                   status=print):
+    """ Evolve one Environment per island in parallel and return a merged Environment holding the
+    combined Pareto front.
+    build: picklable function returning a ready-to-evolve Environment (objectives, agents, population)
+    epochs, interval: number of migration rounds, and seconds of evolution per round
+    migrants: solutions each island sends to each neighbour per round
+    topology: 'ring', 'full', 'random', or a function (index, islands) -> list of target islands
+    status: called with a dict for every island and epoch, e.g., to print progress
+    Raises RuntimeError, after stopping the other islands, when an island fails """
+    islands = islands or os.cpu_count()
+    topology = TOPOLOGIES[topology] if isinstance(topology, str) else topology
+    seeds = np.random.SeedSequence(seed).generate_state(islands)
+    inboxes = [Queue() for _ in range(islands)]
+    updates = Queue()
+    results = Queue()
+
+    workers = [Process(target=_island, args=(i, build, int(seeds[i]), epochs, interval, migrants, topology,
+                                             inboxes, updates, results))
+               for i in range(islands)]
+    for worker in workers:
+        worker.start()
+
+    try:
+        for _ in range(islands * epochs):
+            record = _receive(updates, workers)
+            if status is not None:
+                status(record)
+        fronts = [_receive(results, workers) for _ in range(islands)]
+    except BaseException:
+        for worker in workers:
+            worker.terminate()
+        raise
+    for worker in workers:
+        worker.join()
+
+    merged = build()
+    merged.pop = {}
+    for _, front in sorted(fronts, key=lambda item: item[0]):
+        merged.add_solutions(front)
+    merged.remove_dominated()
+    return merged
+
+
+def main():
+    import main as ta
+
+    parser = argparse.ArgumentParser(description='Island-model evolution of TA assignments')
+    parser.add_argument('-i', '--islands', type=int, default=None, help='Number of islands (default: one per core)')
+    parser.add_argument('-e', '--epochs', type=int, default=10, help='Number of migration rounds')
+    parser.add_argument('-t', '--interval', type=float, default=10.0, help='Seconds of evolution per round')
+    parser.add_argument('-m', '--migrants', type=int, default=5, help='Migrants sent to each neighbour per round')
+    parser.add_argument('--topology', choices=sorted(TOPOLOGIES), default='ring', help='Migration topology')
+    parser.add_argument('-s', '--seed', type=int, default=0, help='Seed the island seeds are derived from')
+    args = parser.parse_args()
+
+    E = evolve_islands(ta.build_environment, args.islands, args.epochs, args.interval, args.migrants,
+                       args.topology, args.seed)
+    print("Merged Pareto front size:", E.size())
+    for evaluation in E.evaluations():
+        print(evaluation)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,33 +5,56 @@ Janav Sama and Jacob Jawharjian
 """
 
 from evo import Environment
-from function_agents import overallocation, conflicts, undersupport, unwilling, unpreferred, Agents
+from archive import Archive
+from telemetry import MetricsLog
+from function_agents import PROBLEM, Agents
 import numpy as np
 import pandas as pd
+import os
 import time
 
 sections_df = pd.read_csv("sections.csv")
 
 
-def main():
-    E = Environment()
+def build_environment():
+    """ Create an Environment with the TA objectives and agents registered and a random starting population """
+    E = Environment(scheduler='adaptive')  # run the agents whose offspring reach the front more often
 
-    # Define and register objective functions
-    E.add_fitness_criteria("conflicts", conflicts)
-    E.add_fitness_criteria("undersupport", undersupport)
-    E.add_fitness_criteria("unwilling", unwilling)
-    E.add_fitness_criteria("unpreferred", unpreferred)
-    E.add_fitness_criteria("overallocation", overallocation)
+    # Register the objective functions, evaluated together over batches of solutions
+    E.set_evaluator(PROBLEM.objectives, PROBLEM.evaluate)
 
     # Register agents
     E.add_agent("mutate", Agents.mutate, k=1)  # Register the mutate agent
     E.add_agent("crossover", Agents.crossover, k=2)  # Register the crossover agent
 
+    # Seed the population with random assignments for the agents to improve on
+    E.add_solutions([PROBLEM.random_assignment() for _ in range(20)])
+    return E
+
+
+def main():
+    E = build_environment()
+
+    # Keep the Pareto front of the whole run on disk, resuming from the previous run's front if there is one
+    if os.path.exists("front.npz"):
+        E.attach_archive(Archive.load("front.npz", PROBLEM, every=60), warm_start=True)
+    else:
+        E.attach_archive(Archive("front.npz", every=60))
+
     # Print initial population size
     print("Initial Population Size:", E.size())
 
+    # Report progress every status iterations, and log the full telemetry records
+    def report(record):
+        print(f"Iteration: {record['iteration']} Population Size: {record['size']} "
+              f"Front: {record['front']} Hypervolume: {record['hypervolume']:.4g}")
+
+    metrics = MetricsLog("telemetry.jsonl", callback=report)
+    E.add_observer(metrics)
+
     # Run the evolver
-    E.evolve(time_limit=600)
+    E.evolve(n=10 ** 9, status=10000, time_limit=600)
+    metrics.close()
 
     # Print the final result
     print(E)
@@ -0,0 +1,66 @@
+"""
+File: synthetic.py
+Description: Synthetic TA assignment instances of any size.
+Instances have the layout of tas.csv and sections.csv. Preferences follow the densities of the real
+data (about 68% unwilling, 19% willing and 13% preferred), but every TA gets their own mix, so some TAs
+are willing to take almost anything and others almost nothing, as in the real survey.
+"""
+
+import argparse
+import os
+import numpy as np
+import pandas as pd
+
+DENSITY = {'U': 0.68, 'W': 0.19, 'P': 0.13}  # share of each preference in tas.csv
+MAX_ASSIGNED = {0: 0.05, 1: 0.63, 2: 0.30, 3: 0.02}  # share of TAs by max_assigned in tas.csv
+MIN_TA = {2: 0.47, 3: 0.53}  # share of sections by min_ta in sections.csv
+
+
+def make_instance(tas, sections, density=None, concentration=2.0, seed=0):
+    """ Generate (tas_df, sections_df) with the given numbers of TAs and sections.
+    density: share of 'U', 'W' and 'P' preferences overall (default: that of the real data)
+    concentration: how alike the TAs are; each TA's preference mix is drawn from a Dirichlet
+    distribution around density, and lower values spread the TAs further apart """
+    rng = np.random.default_rng(seed)
+    density = density or DENSITY
+    codes = np.array(list(density))
+    mix = rng.dirichlet(concentration * np.array(list(density.values())) * len(codes), size=tas)
+    # Inverse-CDF draw of every TA's preference for every section from that TA's mix
+    cumulative = np.cumsum(mix, axis=1)
+    draws = rng.random((tas, sections))
+    preferences = codes[np.minimum((draws[:, :, None] > cumulative[:, None, :]).sum(axis=2), len(codes) - 1)]
+
+    tas_df = pd.DataFrame(preferences, columns=[str(s) for s in range(sections)])
+    tas_df.insert(0, 'ta_id', np.arange(tas))
+    tas_df.insert(1, 'name', [f"TA {t}" for t in range(tas)])
+    tas_df.insert(2, 'max_assigned', rng.choice(list(MAX_ASSIGNED), size=tas, p=list(MAX_ASSIGNED.values())))
+
+    min_ta = rng.choice(list(MIN_TA), size=sections, p=list(MIN_TA.values()))
+    sections_df = pd.DataFrame({'section': np.arange(sections),
+                                'instructor': [f"Instructor {s % 50}" for s in range(sections)],
+                                'daytime': [f"Slot {s % 40}" for s in range(sections)],
+                                'location': [f"Room {s % 60}" for s in range(sections)],
+                                'students': rng.integers(19, 41, size=sections),
+                                'topic': rng.choice(['DS', 'Health', 'Python', 'Viz'], size=sections),
+                                'min_ta': min_ta,
+                                'max_ta': min_ta + 1})
+    return tas_df, sections_df
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic TA assignment instance')
+    parser.add_argument('-t', '--tas', type=int, required=True, help='Number of TAs')
+    parser.add_argument('-s', '--sections', type=int, required=True, help='Number of sections')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    parser.add_argument('-o', '--output', default='.', help='Directory to write tas.csv and sections.csv to')
+    args = parser.parse_args()
+
+    tas_df, sections_df = make_instance(args.tas, args.sections, seed=args.seed)
+    os.makedirs(args.output, exist_ok=True)
+    tas_df.to_csv(os.path.join(args.output, 'tas.csv'), index=False)
+    sections_df.to_csv(os.path.join(args.output, 'sections.csv'), index=False)
+    print("Written", args.tas, "TAs and", args.sections, "sections to:", args.output)
+
+
+if __name__ == '__main__':
+    main()
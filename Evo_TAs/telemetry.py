@@ -0,0 +1,72 @@
+"""
+File: telemetry.py
+Description: Observers for the telemetry records sent by Environment.evolve().
+Attach them with E.add_observer(...). An environment without observers collects no telemetry.
+"""
+
+import json
+import numpy as np
+import evo
+
+
+def hypervolume(scores, reference, samples=20000, rng=None):
+    """ Monte Carlo estimate of the volume dominated by the rows of an (n, m) score matrix (all objectives
+    minimized) and bounded by the reference point: the fraction of uniform samples in the box between
+    the best scores and the reference that some row dominates, times the volume of the box """
+    rng = np.random.default_rng() if rng is None else rng
+    reference = np.asarray(reference, dtype=float)
+    scores = np.asarray(scores, dtype=float).reshape(-1, len(reference))
+    scores = scores[(scores <= reference).all(axis=1)]
+    if len(scores) == 0:
+        return 0.0
+
+    lower = scores.min(axis=0)
+    volume = np.prod(reference - lower)
+    if volume == 0:
+        return 0.0
+    hits = 0
+    for start in range(0, samples, 1000):
+        points = rng.uniform(lower, reference, size=(min(1000, samples - start), len(reference)))
+        dominated = np.zeros(len(points), dtype=bool)
+        for row in scores:
+            dominated |= (row <= points).all(axis=1)
+        hits += np.count_nonzero(dominated)
+    return volume * hits / samples
+
+
+class MetricsLog:
+    """ Observer that completes each record with the size and hypervolume of the population's Pareto front,
+    keeps them in history, and passes them on to a callback and/or a JSON-lines file """
+
+    def __init__(self, path=None, callback=None, reference=None, samples=20000, seed=0):
+        """ path: JSON-lines file to write, one record per line (None for no file)
+        callback: called with each completed record, e.g., print
+        reference: hypervolume reference point; by default the worst score per objective in the first
+        record's population plus one, kept fixed so that hypervolumes are comparable over the run """
+        self.file = open(path, 'w') if path is not None else None
+        self.callback = callback
+        self.reference = reference
+        self.samples = samples
+        self.rng = np.random.default_rng(seed)
+        self.history = []
+
+    def __call__(self, E, record):
+        """ Complete, keep and emit one record """
+        scores = evo.Environment._scores(E.evaluations())
+        front = scores[evo.nondominated(scores)]
+        if self.reference is None and len(scores):
+            self.reference = scores.max(axis=0) + 1
+        record = dict(record, front=len(front),
+                      hypervolume=hypervolume(front, self.reference, self.samples, self.rng) if len(front) else 0.0)
+
+        self.history.append(record)
+        if self.file is not None:
+            self.file.write(json.dumps(record) + '\n')
+            self.file.flush()
+        if self.callback is not None:
+            self.callback(record)
+
+    def close(self):
+        """ Close the JSON-lines file """
+        if self.file is not None:
+            self.file.close()
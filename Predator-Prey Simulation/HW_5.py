@@ -1,80 +1,132 @@
 # Importing libraries
-import random as rnd
-import copy
+from collections import deque
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 from matplotlib.colors import ListedColormap
 import argparse
+import time
+import tracemalloc
 
-# Using Argparse for inputs from terminal
-parser = argparse.ArgumentParser(description='Simulation of foxes and rabbits in a field')
+# Value variables (defaults, overridden from the command line or through configure())
 
-parser.add_argument('-g', '--grass_growth_rate', type=float, required=True,
-                    help='Rate at which grass grows in the field')
+SIZE = 400  # x/y dimensions of the field
+WRAP = True  # When moving beyond the border, do we wrap around to the other size
+GRASS_RATE = 0.1  # Probability of grass growing at any given location
+SPEED = 2  # Number of generations per frame
+OFFSPRING_RABBITS = 2  # The number of offspring when a rabbit reproduces
+INIT_RABBITS = 100  # Number of starting rabbits
+OFFSPRING_FOXES = 1  # The number of offspring when a fox reproduces
+INIT_FOXES = 10  # Number of starting fox
+K_COUNT = 10  # Foxes KCount
+CYCLE = 1000  # Number of cycles (generations) to be in the field
 
-parser.add_argument('-fs', '--field_size', type=int, required=True,
-                    help='Size of the field')
+SETTINGS = ('SIZE', 'WRAP', 'GRASS_RATE', 'SPEED', 'OFFSPRING_RABBITS', 'INIT_RABBITS', 'OFFSPRING_FOXES',
+            'INIT_FOXES', 'K_COUNT', 'CYCLE')
 
-parser.add_argument('-nf', '--initial_foxes', type=int, required=True,
-                    help='Number of initial foxes in the field')
+PHASES = ('move', 'eat', 'survive', 'reproduce', 'grow')  # Steps of one generation, in order
 
-parser.add_argument('-nr', '--initial_rabbits', type=int, required=True,
-                    help='Number of initial rabbits in the field')
+STREAMS = ('placement', 'rabbit_move', 'fox_move', 'rabbit_birth', 'fox_birth', 'grass')  # Random streams
 
-parser.add_argument('-kc', '--k_count', type=int, required=True,
-                    help='Foxes KCount')
 
-parser.add_argument('-cy', '--cycle', type=int, required=True,
-                    help='Number of cycles (generations) to be in the field')
+def configure(**settings):
+    """Override simulation settings by their lower-case names, e.g. configure(size=100, grass_rate=0.05).
+    Settings given as None are left unchanged."""
+    for name, value in settings.items():
+        if name.upper() not in SETTINGS:
+            raise ValueError(f"Unknown setting: {name}")
+        if value is not None:
+            globals()[name.upper()] = value
 
-args = parser.parse_args()
 
-# Value variables
+def make_streams(seed=None):
+    """Create one independent NumPy Generator per entry of STREAMS, all derived from a single seed
+    (an int, a SeedSequence, or None for fresh entropy)."""
+    sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    return {name: np.random.default_rng(child) for name, child in zip(STREAMS, sequence.spawn(len(STREAMS)))}
 
-SIZE = args.field_size  # x/y dimensions of the field
-WRAP = True  # When moving beyond the border, do we wrap around to the other size
-GRASS_RATE = args.grass_growth_rate  # Probability of grass growing at any given location
-SPEED = 2  # Number of generations per frame
-OFFSPRING_RABBITS = 2  # The number of offspring when a rabbit reproduces
-INIT_RABBITS = args.initial_rabbits  # Number of starting rabbits
-OFFSPRING_FOXES = 1  # The number of offspring when a fox reproduces
-INIT_FOXES = args.initial_foxes  # Number of starting fox
-K_COUNT = args.k_count  # Foxes KCount
-CYCLE = args.cycle  # Number of cycles (generations) to be in the field
+
+def settings():
+    """Return the current simulation settings keyed by their lower-case names."""
+    return {name.lower(): globals()[name] for name in SETTINGS}
+
+
+def add_arguments(parser, required=True):
+    """Add the command line options shared by every predator-prey script to an argparse parser."""
+    parser.add_argument('-g', '--grass_growth_rate', type=float, required=required,
+                        help='Rate at which grass grows in the field')
+
+    parser.add_argument('-fs', '--field_size', type=int, required=required,
+                        help='Size of the field')
+
+    parser.add_argument('-nf', '--initial_foxes', type=int, required=required,
+                        help='Number of initial foxes in the field')
+
+    parser.add_argument('-nr', '--initial_rabbits', type=int, required=required,
+                        help='Number of initial rabbits in the field')
+
+    parser.add_argument('-kc', '--k_count', type=int, required=required,
+                        help='Foxes KCount')
+
+    parser.add_argument('-b', '--backend', choices=['object', 'array'], default='object',
+                        help='Store animals as Python objects or as NumPy arrays')
+
+    parser.add_argument('-s', '--seed', type=int, default=None,
+                        help='Seed for the random streams, for a reproducible run')
+
+
+def configure_from_args(args):
+    """Apply the settings parsed from the options added by add_arguments()."""
+    configure(size=args.field_size, grass_rate=args.grass_growth_rate, init_rabbits=args.initial_rabbits,
+              init_foxes=args.initial_foxes, k_count=args.k_count)
 
 
 # Defining Rabbit properties
 
 class Rabbit:
-    def __init__(self):
-        """Initialize a rabbit with random coordinates, eaten grass count, and lifespan."""
-        self.x = rnd.randrange(0, SIZE)
-        self.y = rnd.randrange(0, SIZE)
+    __slots__ = ('x', 'y', 'eaten', 'lifespan', 'caught')
+
+    def __init__(self, x, y):
+        """Initialize a rabbit at the given coordinates, with eaten grass count and lifespan at zero."""
+        self.x = x
+        self.y = y
         self.eaten = 0
         self.lifespan = 0
+        self.caught = False
 
-    def reproduce(self):
-        """Create a new rabbit offspring with adjusted coordinates within a certain range."""
+    def reproduce(self, dx, dy, offspring=None):
+        """Create a new rabbit offspring placed dx, dy away from the parent, within the field. A retired
+        rabbit can be passed in to be reused as the offspring."""
         self.eaten = 0
         self.lifespan = 0
-        offspring = copy.deepcopy(self)
-        offspring.x = max(0, min(SIZE - 1, self.x + rnd.randint(-10, 10)))
-        offspring.y = max(0, min(SIZE - 1, self.y + rnd.randint(-10, 10)))
+        offspring = self.clone(offspring)
+        offspring.x = max(0, min(SIZE - 1, self.x + dx))
+        offspring.y = max(0, min(SIZE - 1, self.y + dy))
         return offspring
 
+    def clone(self, into=None):
+        """Copy this rabbit's state into another rabbit, or into a new one if none is given."""
+        if into is None:
+            into = Rabbit.__new__(Rabbit)
+        into.x = self.x
+        into.y = self.y
+        into.eaten = self.eaten
+        into.lifespan = self.lifespan
+        into.caught = False
+        return into
+
     def eat(self, amount):
         """Record the amount of grass eaten by a rabbit."""
         self.eaten += amount
 
-    def move(self):
-        """Move the rabbit within the field boundaries, updating its coordinates and lifespan."""
+    def move(self, dx, dy):
+        """Move the rabbit by dx, dy within the field boundaries, updating its coordinates and lifespan."""
         if WRAP:
-            self.x = (self.x + rnd.choice([-1, 0, 1])) % SIZE
-            self.y = (self.y + rnd.choice([-1, 0, 1])) % SIZE
+            self.x = (self.x + dx) % SIZE
+            self.y = (self.y + dy) % SIZE
         else:
-            self.x = min(SIZE - 1, max(0, (self.x + rnd.choice([-1, 0, 1]))))
-            self.y = min(SIZE - 1, max(0, (self.y + rnd.choice([-1, 0, 1]))))
+            self.x = min(SIZE - 1, max(0, self.x + dx))
+            self.y = min(SIZE - 1, max(0, self.y + dy))
 
         self.lifespan += 1
 
@@ -82,24 +134,39 @@ class Rabbit:
 # Defining Fox properties
 
 class Fox:
-    def __init__(self):
-        """Initialize a fox with random coordinates, eaten rabbits count, hunger counter, and lifespan."""
-        self.x = rnd.randrange(0, SIZE)
-        self.y = rnd.randrange(0, SIZE)
+    __slots__ = ('x', 'y', 'eaten', 'hunger_counter', 'lifespan')
+
+    def __init__(self, x, y):
+        """Initialize a fox at the given coordinates, with eaten rabbits count, hunger counter, and lifespan
+        at zero."""
+        self.x = x
+        self.y = y
         self.eaten = 0
         self.hunger_counter = 0
         self.lifespan = 0  # Initialize lifespan counter
 
-    def reproduce(self):
-        """Create a new fox offspring with adjusted coordinates within a certain range."""
+    def reproduce(self, dx, dy, offspring=None):
+        """Create a new fox offspring placed dx, dy away from the parent, within the field. A retired fox
+        can be passed in to be reused as the offspring."""
         self.eaten = 0
         self.hunger_counter = 0
         self.lifespan = 0  # Reset lifespan counter
-        offspring = copy.deepcopy(self)
-        offspring.x = max(0, min(SIZE - 1, self.x + rnd.randint(-10, 10)))
-        offspring.y = max(0, min(SIZE - 1, self.y + rnd.randint(-10, 10)))
+        offspring = self.clone(offspring)
+        offspring.x = max(0, min(SIZE - 1, self.x + dx))
+        offspring.y = max(0, min(SIZE - 1, self.y + dy))
         return offspring
 
+    def clone(self, into=None):
+        """Copy this fox's state into another fox, or into a new one if none is given."""
+        if into is None:
+            into = Fox.__new__(Fox)
+        into.x = self.x
+        into.y = self.y
+        into.eaten = self.eaten
+        into.hunger_counter = self.hunger_counter
+        into.lifespan = self.lifespan
+        return into
+
     def eat(self, amount):
         """Record the amount of rabbits eaten by a fox and resets its hunger counter."""
         self.eaten += amount
@@ -112,26 +179,57 @@ class Fox:
         else:
             return False
 
-    def move(self):
-        """Move the fox within the field boundaries, updating its coordinates, hunger counter, and lifespan."""
+    def move(self, dx, dy):
+        """Move the fox by dx, dy within the field boundaries, updating its coordinates, hunger counter, and
+        lifespan."""
         if WRAP:
-            self.x = (self.x + rnd.choice([-2, -1, 0, 1, 2])) % SIZE
-            self.y = (self.y + rnd.choice([-2, -1, 0, 1, 2])) % SIZE
+            self.x = (self.x + dx) % SIZE
+            self.y = (self.y + dy) % SIZE
         else:
-            self.x = min(SIZE - 1, max(0, (self.x + rnd.choice([-2, -1, 0, 1, 2]))))
-            self.y = min(SIZE - 1, max(0, (self.y + rnd.choice([-2, -1, 0, 1, 2]))))
+            self.x = min(SIZE - 1, max(0, self.x + dx))
+            self.y = min(SIZE - 1, max(0, self.y + dy))
 
         self.hunger_counter += 1
         self.lifespan += 1
 
 
+class Den:
+    """Free list of dead animals of one kind, handed out again as newborns instead of allocating new ones."""
+
+    def __init__(self, kind):
+        """Initialize an empty den for Rabbit or Fox."""
+        self.kind = kind
+        self.free = []
+
+    def retire(self, animals):
+        """Put dead animals on the free list."""
+        self.free.extend(animals)
+
+    def take(self, n):
+        """Return n animals to overwrite, reusing retired ones first and allocating only the rest."""
+        reused = self.free[max(0, len(self.free) - n):]
+        del self.free[len(self.free) - len(reused):]
+        return reused + [self.kind.__new__(self.kind) for _ in range(n - len(reused))]
+
+
 # Properties of Field (land where Rabbits and Foxes exists)
 class Field:
-    def __init__(self):
-        """Initialize the field with empty lists for rabbits and foxes, and a grid representing the field."""
+    def __init__(self, seed=None):
+        """Initialize the field with empty lists for rabbits and foxes, the grass on every location, a
+        separate grid that is only redrawn when the field is displayed, and the random streams."""
         self.rabbits = []
         self.foxes = []
+        self.burrows = {}  # (x, y) -> rabbits standing in that cell, in list order
+        self.rabbit_den = Den(Rabbit)
+        self.fox_den = Den(Fox)
+        self.grass = np.ones(shape=(SIZE, SIZE), dtype=int)
         self.field = np.ones(shape=(SIZE, SIZE), dtype=int)
+        self.drawn = np.zeros(0, dtype=int)  # flat cells holding an animal in self.field
+        self.dirty = []  # flat cells whose grass changed since the last render, or None to redraw everything
+        self.pending = 0  # number of cells in self.dirty
+        self.cycle = 0  # number of generations simulated so far
+        self.observers = []  # callables notified with per-phase statistics after each generation
+        self.rng = make_streams(seed)  # stream name -> numpy Generator
 
     def add_rabbit(self, rabbit):
         """Add a rabbit to the field."""
@@ -141,67 +239,323 @@ class Field:
         """Add a fox to the field."""
         self.foxes.append(fox)
 
+    def add_rabbits(self, n):
+        """Add n rabbits at random locations."""
+        for x, y in zip(*self.rng['placement'].integers(0, SIZE, (2, n)).tolist()):
+            self.add_rabbit(Rabbit(x, y))
+
+    def add_foxes(self, n):
+        """Add n foxes at random locations."""
+        for x, y in zip(*self.rng['placement'].integers(0, SIZE, (2, n)).tolist()):
+            self.add_fox(Fox(x, y))
+
     def move(self):
-        """Move all rabbits and foxes within the field."""
-        for r in self.rabbits:
-            r.move()
-        for f in self.foxes:
-            f.move()
+        """Move all rabbits and foxes within the field, filing each rabbit under the cell it lands on.
+        The moves of each species are drawn as one batch."""
+        self.burrows = {}
+        steps = self.rng['rabbit_move'].integers(-1, 2, (2, len(self.rabbits))).tolist()
+        for r, dx, dy in zip(self.rabbits, *steps):
+            r.move(dx, dy)
+            self.burrows.setdefault((r.x, r.y), deque()).append(r)
+        steps = self.rng['fox_move'].integers(-2, 3, (2, len(self.foxes))).tolist()
+        for f, dx, dy in zip(self.foxes, *steps):
+            f.move(dx, dy)
 
     def eat(self):
         """Manage the eating behavior of rabbits and foxes."""
+        grazed = []
         for r in self.rabbits:
-            r.eat(self.field[r.x, r.y])
-            self.field[r.x, r.y] = 0
+            r.eat(self.grass[r.x, r.y])
+            self.grass[r.x, r.y] = 0
+            grazed.append(r.x * SIZE + r.y)
+        self.touch(np.array(grazed, dtype=int))
+        caught = []
         for f in self.foxes:
-            prey = [r for r in self.rabbits if r.x == f.x and r.y == f.y]
-            ate = False
+            prey = self.burrows.get((f.x, f.y))
             if prey:
                 f.eat(1)
-                ate = True
-                self.rabbits.remove(prey[0])
-            if not ate:
+                r = prey.popleft()
+                r.caught = True
+                caught.append(r)
+            else:
                 f.eat(0)
+        if caught:
+            self.rabbits = [r for r in self.rabbits if not r.caught]
+            self.rabbit_den.retire(caught)
 
     def survive(self):
         """Survive or die"""
-        self.rabbits = [r for r in self.rabbits if (r.eaten > 0) and r.lifespan <= 10]
-        self.foxes = [f for f in self.foxes if (f.eaten > 0 or not f.hungry()) and f.lifespan <= 20]
+        rabbits, dead = [], []
+        for r in self.rabbits:
+            (rabbits if (r.eaten > 0) and r.lifespan <= 10 else dead).append(r)
+        self.rabbits = rabbits
+        self.rabbit_den.retire(dead)
+
+        foxes, dead = [], []
+        for f in self.foxes:
+            (foxes if (f.eaten > 0 or not f.hungry()) and f.lifespan <= 20 else dead).append(f)
+        self.foxes = foxes
+        self.fox_den.retire(dead)
 
     def reproduce(self):
-        """Handles reproduction of rabbits and foxes."""
-        rabbits_born = []
-        for r in self.rabbits:
-            for _ in range(rnd.randint(1, OFFSPRING_RABBITS)):
-                rabbits_born.append(r.reproduce())
+        """Handles reproduction of rabbits and foxes. All newborns of a species are taken from its den in
+        one batch before the parents fill them in."""
+        litters = self.rng['rabbit_birth'].integers(1, OFFSPRING_RABBITS + 1, len(self.rabbits)).tolist()
+        parents = [r for r, litter in zip(self.rabbits, litters) for _ in range(litter)]
+        rabbits_born = self.rabbit_den.take(len(parents))
+        offsets = self.rng['rabbit_birth'].integers(-10, 11, (2, len(parents))).tolist()
+        for r, offspring, dx, dy in zip(parents, rabbits_born, *offsets):
+            r.reproduce(dx, dy, offspring)
         self.rabbits += rabbits_born
 
-        foxes_born = []
-
-        for f in self.foxes:
-            for _ in range(1):
-                foxes_born.append(f.reproduce())
+        foxes_born = self.fox_den.take(len(self.foxes))
+        offsets = self.rng['fox_birth'].integers(-10, 11, (2, len(self.foxes))).tolist()
+        for f, offspring, dx, dy in zip(self.foxes, foxes_born, *offsets):
+            f.reproduce(dx, dy, offspring)
         self.foxes += foxes_born
 
     def grow(self):
         """Simulates grass growth in the field."""
-        growloc = (np.random.rand(SIZE, SIZE) < GRASS_RATE) * 1
-        self.field = np.maximum(self.field, growloc)
+        growloc = (self.rng['grass'].random((SIZE, SIZE)) < GRASS_RATE) & (self.grass == 0)
+        self.grass[growloc] = 1
+        self.touch(np.flatnonzero(growloc))
 
-    def generation(self):
+    def generation(self, timings=None):
         """Executes a generation cycle for the field, involving movement, eating, survival, reproduction,
-        and grass growth."""
-        self.move()
-        self.eat()
-        self.survive()
-        self.reproduce()
-        self.grow()
+        and grass growth. If a timings dict is given, the wall time of each phase is stored in it."""
+        if self.observers:
+            records = [self.profile(phase) for phase in PHASES]
+            self.cycle += 1
+            for observer in self.observers:
+                observer(self, records)
+            if timings is not None:
+                timings.update((record['phase'], record['seconds']) for record in records)
+            return
+
+        if timings is None:
+            for phase in PHASES:
+                getattr(self, phase)()
+        else:
+            for phase in PHASES:
+                start = time.perf_counter()
+                getattr(self, phase)()
+                timings[phase] = time.perf_counter() - start
+        self.cycle += 1
+
+    def add_observer(self, observer):
+        """Register a callable observer(field, records) that is called after every generation with one
+        record per phase, as returned by profile(). With no observers, generation() does no profiling."""
+        self.observers.append(observer)
+
+    def remove_observer(self, observer):
+        """Stop notifying an observer."""
+        self.observers.remove(observer)
+
+    def profile(self, phase):
+        """Run one phase and return a record of its wall time and the populations going in and out.
+        While tracemalloc is tracing, the record also holds the peak bytes allocated during the phase
+        and the bytes still held after it."""
+        rabbits_in, foxes_in = self.population()
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        getattr(self, phase)()
+        seconds = time.perf_counter() - start
+        rabbits_out, foxes_out = self.population()
+
+        record = {'cycle': self.cycle + 1, 'phase': phase, 'seconds': seconds, 'rabbits_in': rabbits_in,
+                  'rabbits_out': rabbits_out, 'foxes_in': foxes_in, 'foxes_out': foxes_out}
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            record['allocated'] = peak - before
+            record['retained'] = current - before
+        return record
+
+    def population(self):
+        """Number of rabbits and number of foxes."""
+        return len(self.rabbits), len(self.foxes)
+
+    def grass_coverage(self):
+        """Fraction of the field covered by grass."""
+        return np.count_nonzero(self.grass) / self.grass.size
+
+    def touch(self, cells):
+        """Remember flat cells whose grass changed, until the next render."""
+        if self.dirty is not None:
+            self.dirty.append(cells)
+            self.pending += len(cells)
+            if self.pending > self.grass.size:
+                self.dirty = None  # Copying the whole grass grid is cheaper from here on
+
+    def positions(self):
+        """Flat cells of all rabbits and of all foxes."""
+        rabbits = np.fromiter((r.x * SIZE + r.y for r in self.rabbits), dtype=int, count=len(self.rabbits))
+        foxes = np.fromiter((f.x * SIZE + f.y for f in self.foxes), dtype=int, count=len(self.foxes))
+        return rabbits, foxes
+
+    def render(self):
+        """Bring the display grid up to date and return it. Only cells whose grass changed, or that held or
+        now hold an animal, are rewritten."""
+        if self.dirty is None:
+            np.copyto(self.field, self.grass)
+        else:
+            cells = np.concatenate(self.dirty + [self.drawn])
+            self.field.flat[cells] = self.grass.flat[cells]
+        rabbits, foxes = self.positions()
+        self.field.flat[rabbits] = 2
+        self.field.flat[foxes] = 3
+        self.drawn = np.concatenate((rabbits, foxes))
+        self.dirty = []
+        self.pending = 0
+        return self.field
+
+
+# Array-based alternative to the Rabbit/Fox objects
+
+def step(coords, moves):
+    """Apply a batch of moves to a coordinate array, wrapping or clamping at the border."""
+    if WRAP:
+        return (coords + moves) % SIZE
+    return np.clip(coords + moves, 0, SIZE - 1)
+
+
+def rank_in_cell(cells):
+    """Position of each animal among the animals sharing its cell, in list order."""
+    order = np.argsort(cells, kind='stable')
+    ordered = cells[order]
+    rank = np.empty(len(cells), dtype=int)
+    rank[order] = np.arange(len(cells)) - np.searchsorted(ordered, ordered, side='left')
+    return rank
+
+
+def count_in_cell(cells, targets):
+    """Number of animals standing in each of the target cells."""
+    ordered = np.sort(cells)
+    return np.searchsorted(ordered, targets, side='right') - np.searchsorted(ordered, targets, side='left')
+
+
+class Herd:
+    """Positions, eaten counts, hunger counters and lifespans of one species, one NumPy array each."""
+    COLUMNS = ('x', 'y', 'eaten', 'hunger_counter', 'lifespan')
+
+    def __init__(self, x=(), y=()):
+        """Initialize a herd with animals at the given coordinates and all counters at zero."""
+        self.x = np.asarray(x, dtype=int)
+        self.y = np.asarray(y, dtype=int)
+        self.eaten = np.zeros(len(self.x), dtype=int)
+        self.hunger_counter = np.zeros(len(self.x), dtype=int)
+        self.lifespan = np.zeros(len(self.x), dtype=int)
+
+    def __len__(self):
+        return len(self.x)
+
+    def cells(self):
+        """Flat cell index of every animal."""
+        return self.x * SIZE + self.y
+
+    def keep(self, mask):
+        """Keep only the animals selected by a boolean mask, preserving their order."""
+        for name in Herd.COLUMNS:
+            setattr(self, name, getattr(self, name)[mask])
+
+    def take(self, index):
+        """Return a new herd holding copies of the animals at the given positions."""
+        herd = Herd()
+        for name in Herd.COLUMNS:
+            setattr(herd, name, getattr(self, name)[index])
+        return herd
+
+    def extend(self, other):
+        """Append the animals of another herd to this one."""
+        for name in Herd.COLUMNS:
+            setattr(self, name, np.concatenate((getattr(self, name), getattr(other, name))))
+
+
+class ArrayField(Field):
+    """Field that stores each species as a Herd of arrays, so every phase is one batched operation per
+    species instead of a loop over Rabbit and Fox objects. The rules are the same as for the objects."""
+
+    def __init__(self, seed=None):
+        """Initialize the field with empty herds, the grass, the display grid and the random streams."""
+        super().__init__(seed)
+        self.rabbits = Herd()
+        self.foxes = Herd()
+
+    def add_rabbits(self, n):
+        """Add n rabbits at random locations."""
+        self.rabbits.extend(Herd(*self.rng['placement'].integers(0, SIZE, (2, n))))
+
+    def add_foxes(self, n):
+        """Add n foxes at random locations."""
+        self.foxes.extend(Herd(*self.rng['placement'].integers(0, SIZE, (2, n))))
 
-        self.field = np.ones(shape=(SIZE, SIZE), dtype=int)
-        for r in self.rabbits:
-            self.field[r.x, r.y] = 2
-        for f in self.foxes:
-            self.field[f.x, f.y] = 3
+    def move(self):
+        """Move all rabbits by up to one cell and all foxes by up to two cells in each direction."""
+        rabbits, foxes = self.rabbits, self.foxes
+        dx, dy = self.rng['rabbit_move'].integers(-1, 2, (2, len(rabbits)))
+        rabbits.x = step(rabbits.x, dx)
+        rabbits.y = step(rabbits.y, dy)
+        rabbits.lifespan += 1
+
+        dx, dy = self.rng['fox_move'].integers(-2, 3, (2, len(foxes)))
+        foxes.x = step(foxes.x, dx)
+        foxes.y = step(foxes.y, dy)
+        foxes.hunger_counter += 1
+        foxes.lifespan += 1
+
+    def eat(self):
+        """Manage the eating behavior of rabbits and foxes."""
+        rabbits, foxes = self.rabbits, self.foxes
+        rabbit_cells = rabbits.cells()
+        rabbit_rank = rank_in_cell(rabbit_cells)
+
+        # Only the first rabbit to reach a cell finds any grass there
+        first = rabbit_rank == 0
+        rabbits.eaten[first] += self.grass.flat[rabbit_cells[first]]
+        self.grass.flat[rabbit_cells] = 0
+        self.touch(rabbit_cells)
+
+        # The i-th fox in a cell catches the i-th rabbit in that cell, if there is one
+        fox_cells = foxes.cells()
+        caught = rank_in_cell(fox_cells) < count_in_cell(rabbit_cells, fox_cells)
+        foxes.eaten += caught
+        foxes.hunger_counter[:] = 0  # Fox.eat resets the counter whether or not it caught anything
+        rabbits.keep(rabbit_rank >= count_in_cell(fox_cells, rabbit_cells))
+
+    def survive(self):
+        """Survive or die"""
+        rabbits, foxes = self.rabbits, self.foxes
+        rabbits.keep((rabbits.eaten > 0) & (rabbits.lifespan <= 10))
+        foxes.keep(((foxes.eaten > 0) | (foxes.hunger_counter < K_COUNT)) & (foxes.lifespan <= 20))
+
+    def reproduce(self):
+        """Handles reproduction of rabbits and foxes."""
+        rabbits, foxes = self.rabbits, self.foxes
+
+        litters = self.rng['rabbit_birth'].integers(1, OFFSPRING_RABBITS + 1, len(rabbits))
+        rabbits.eaten[:] = 0
+        rabbits.lifespan[:] = 0
+        rabbits.extend(self.offspring(rabbits, litters, self.rng['rabbit_birth']))
+
+        foxes.eaten[:] = 0
+        foxes.hunger_counter[:] = 0
+        foxes.lifespan[:] = 0
+        foxes.extend(self.offspring(foxes, np.ones(len(foxes), dtype=int), self.rng['fox_birth']))
+
+    @staticmethod
+    def offspring(herd, litters, rng):
+        """Copy each parent litters[i] times and scatter the copies within 10 cells of the parent."""
+        born = herd.take(np.repeat(np.arange(len(herd)), litters))
+        dx, dy = rng.integers(-10, 11, (2, len(born)))
+        born.x = np.clip(born.x + dx, 0, SIZE - 1)
+        born.y = np.clip(born.y + dy, 0, SIZE - 1)
+        return born
+
+    def positions(self):
+        """Flat cells of all rabbits and of all foxes."""
+        return self.rabbits.cells(), self.foxes.cells()
 
 
 # List of colors
@@ -209,30 +563,40 @@ cmap = ListedColormap(['tan', 'green', 'blue', 'red'])
 
 
 def animate(i, field, im):
-    """Updates the animation frames by generating new generations of the field."""
+    """Updates the animation frames by generating new generations of the field, redrawing the grid only
+    for the frame that is shown."""
     for _ in range(SPEED):
         field.generation()
-    im.set_array(field.field)
+    im.set_array(field.render())
     plt.title("Generation: " + str(i * SPEED) + " Rabbits: " + str(len(field.rabbits)) + " Foxes: " +
               str(len(field.foxes)))
     return im,
 
 
-def main():
+def make_field(backend='object', seed=None):
+    """Create the ecosystem with the chosen backend and initialize it with some rabbits and foxes."""
+    field = ArrayField(seed) if backend == 'array' else Field(seed)
+    field.add_rabbits(INIT_RABBITS)
+    field.add_foxes(INIT_FOXES)
+    return field
 
-    # Create the ecosystem
-    field = Field()
 
-    # Initialize with some rabbits
-    for _ in range(args.initial_rabbits):
-        field.add_rabbit(Rabbit())
+def main():
+
+    # Using Argparse for inputs from terminal
+    parser = argparse.ArgumentParser(description='Simulation of foxes and rabbits in a field')
+    add_arguments(parser)
+    parser.add_argument('-cy', '--cycle', type=int, required=True,
+                        help='Number of cycles (generations) to be in the field')
+    args = parser.parse_args()
+    configure_from_args(args)
+    configure(cycle=args.cycle)
 
-    # Initialize with some foxes
-    for _ in range(args.initial_foxes):
-        field.add_fox(Fox())
+    # Create the ecosystem
+    field = make_field(args.backend, args.seed)
 
     # Setting up animations
-    array = np.ones(shape=(args.field_size, args.field_size), dtype=int)
+    array = np.ones(shape=(SIZE, SIZE), dtype=int)
     fig = plt.figure(figsize=(10, 10))
     im = plt.imshow(array, cmap=cmap, interpolation='nearest', aspect='auto', vmin=0, vmax=3)
     anim = animation.FuncAnimation(fig, animate, fargs=(field, im), frames=CYCLE, interval=1000, repeat=True)
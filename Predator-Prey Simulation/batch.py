@@ -0,0 +1,130 @@
+"""
+File: batch.py
+Description: Headless batch runner for the fox and rabbit simulation.
+Runs Field.generation() without creating any figure and records a columnar time series
+of population counts, grass coverage and per-phase timings.
+"""
+
+import argparse
+import importlib.util
+import numpy as np
+import HW_5 as sim
+import checkpoint
+import profiling
+import tiled
+
+COUNT_COLUMNS = ('generation', 'rabbits', 'foxes')
+VALUE_COLUMNS = ('grass',) + tuple(phase + '_seconds' for phase in sim.PHASES)
+
+
+def run(generations, backend='array', field=None, seed=None):
+    """Run the simulation for a number of generations and return the time series as a dict of arrays,
+    one entry per generation. A field can be passed in to continue an existing run."""
+    if field is None:
+        field = sim.make_field(backend, seed)
+
+    series = {name: np.zeros(generations, dtype=int) for name in COUNT_COLUMNS}
+    series.update({name: np.zeros(generations) for name in VALUE_COLUMNS})
+    timings = {}
+    for g in range(generations):
+        field.generation(timings)
+        series['generation'][g] = field.cycle
+        series['rabbits'][g], series['foxes'][g] = field.population()
+        series['grass'][g] = field.grass_coverage()
+        for phase in sim.PHASES:
+            series[phase + '_seconds'][g] = timings[phase]
+    return series
+
+
+def check_output(path):
+    """Raise ImportError if a time series cannot be saved to path, so that a run can fail before it starts
+    rather than after. Parquet files need pandas and either pyarrow or fastparquet."""
+    if path.endswith('.parquet'):
+        if importlib.util.find_spec('pandas') is None:
+            raise ImportError("writing .parquet needs pandas")
+        if importlib.util.find_spec('pyarrow') is None and importlib.util.find_spec('fastparquet') is None:
+            raise ImportError("writing .parquet needs pyarrow or fastparquet")
+
+
+def save(series, path):
+    """Write a time series to .npz, .parquet (needs pandas and pyarrow or fastparquet) or, for any other
+    extension, .csv."""
+    if path.endswith('.npz'):
+        np.savez(path, **series)
+    elif path.endswith('.parquet'):
+        import pandas as pd
+        pd.DataFrame(series).to_parquet(path)
+    else:
+        columns = np.column_stack([series[name] for name in series])
+        np.savetxt(path, columns, delimiter=',', header=','.join(series), comments='', fmt='%.9g')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the fox and rabbit simulation without a display')
+    sim.add_arguments(parser, required=False)
+    parser.set_defaults(backend='array')
+    parser.add_argument('-n', '--generations', type=int, required=True,
+                        help='Number of generations to simulate')
+    parser.add_argument('-o', '--output', default='series.csv',
+                        help='Output file (.csv, .npz or .parquet)')
+    parser.add_argument('--restore', default=None,
+                        help='Continue from a checkpoint instead of a fresh field')
+    parser.add_argument('--checkpoint', default=None,
+                        help='Save the final simulation state to this file')
+    parser.add_argument('-t', '--tiles', type=int, default=0,
+                        help='Step the field in this many parallel strips (array backend, no checkpoints)')
+    parser.add_argument('--trace', default=None,
+                        help='Write per-phase statistics of every generation to this JSON-lines file')
+    parser.add_argument('--profile', action='store_true',
+                        help='Print time, population change and allocations per phase at the end')
+    args = parser.parse_args()
+    try:
+        check_output(args.output)
+    except ImportError as e:
+        parser.error(f"cannot write {args.output}: {e}; use a .csv or .npz output instead")
+
+    if args.tiles:
+        conflicts = [option for option, given in (('--restore', args.restore), ('--checkpoint', args.checkpoint),
+                                                  ('--trace', args.trace), ('--profile', args.profile),
+                                                  ('--backend object', args.backend != 'array')) if given]
+        if conflicts:
+            parser.error(f"--tiles cannot be combined with {', '.join(conflicts)}")
+        sim.configure_from_args(args)
+        with tiled.TiledField(args.tiles, args.seed) as field:
+            field.add_rabbits(sim.INIT_RABBITS)
+            field.add_foxes(sim.INIT_FOXES)
+            series = run(args.generations, field=field)
+    else:
+        if args.restore:
+            # The saved field fixes its size, its animals and their storage; only the rates carry over
+            conflicts = [option for option, given in (('-fs', args.field_size), ('-nr', args.initial_rabbits),
+                                                      ('-nf', args.initial_foxes),
+                                                      ('--backend object', args.backend != 'array')) if given]
+            if conflicts:
+                parser.error(f"--restore cannot be combined with {', '.join(conflicts)}")
+            field = checkpoint.load(args.restore, seed=args.seed, grass_rate=args.grass_growth_rate,
+                                    k_count=args.k_count)
+        else:
+            sim.configure_from_args(args)
+            field = sim.make_field(args.backend, args.seed)
+        if args.trace:
+            trace = profiling.TraceWriter(args.trace)
+            field.add_observer(trace)
+        if args.profile:
+            profiler = profiling.PhaseProfiler(allocations=True)
+            field.add_observer(profiler)
+
+        series = run(args.generations, field=field)
+
+        if args.trace:
+            trace.close()
+        if args.profile:
+            print(profiler.summary())
+        if args.checkpoint:
+            checkpoint.save(field, args.checkpoint)
+    save(series, args.output)
+    print("Rabbits:", series['rabbits'][-1], "Foxes:", series['foxes'][-1], "Written to:", args.output)
+
+
+if __name__ == '__main__':
+    main()
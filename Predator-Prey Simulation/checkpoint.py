@@ -0,0 +1,85 @@
+"""
+File: checkpoint.py
+Description: Save and restore the complete state of a fox and rabbit simulation.
+A checkpoint holds the settings, the animals, the grass and the state of the field's random
+streams in one uncompressed .npz file, so a restored run continues bit-for-bit where it stopped.
+Loading the same checkpoint several times with different settings branches what-if scenarios
+from one warmed-up state. Settings are module globals of HW_5 shared by every field in a process,
+so each branch must be loaded and run in its own process, e.g. one worker per branch in a
+ProcessPoolExecutor as sweep.py does.
+"""
+
+import json
+import numpy as np
+import HW_5 as sim
+
+RABBIT_COLUMNS = ('x', 'y', 'eaten', 'lifespan')
+FOX_COLUMNS = ('x', 'y', 'eaten', 'hunger_counter', 'lifespan')
+
+
+def save(field, path):
+    """Write the state of a Field or ArrayField, including its random streams, to path."""
+    backend = 'array' if isinstance(field, sim.ArrayField) else 'object'
+    state = {'settings': np.array(json.dumps(sim.settings())), 'backend': np.array(backend),
+             'cycle': np.array(field.cycle), 'grass': field.grass}
+
+    for prefix, animals, columns in (('rabbit_', field.rabbits, RABBIT_COLUMNS),
+                                     ('fox_', field.foxes, FOX_COLUMNS)):
+        for name in columns:
+            if backend == 'array':
+                state[prefix + name] = getattr(animals, name)
+            else:
+                state[prefix + name] = np.array([getattr(a, name) for a in animals], dtype=int)
+
+    state['streams'] = np.array(json.dumps({name: rng.bit_generator.state for name, rng in field.rng.items()}))
+
+    np.savez(path, **state)
+
+
+def load(path, seed=None, **settings):
+    """Rebuild the field saved at path, random streams included. Keyword settings (as for
+    HW_5.configure) override the saved ones, and a seed gives the field fresh streams instead of the
+    saved ones, which is how several scenarios are branched from one checkpoint. The settings are applied
+    to HW_5's globals, so loading changes the settings of every other field in the same process: run
+    each branch in a process of its own."""
+    with np.load(path) as state:
+        sim.configure(**json.loads(str(state['settings'])))
+        sim.configure(**settings)
+
+        if str(state['backend']) == 'array':
+            field = sim.ArrayField()
+            field.rabbits = _herd(state, 'rabbit_', RABBIT_COLUMNS)
+            field.foxes = _herd(state, 'fox_', FOX_COLUMNS)
+        else:
+            field = sim.Field()
+            field.rabbits = _animals(sim.Rabbit, state, 'rabbit_', RABBIT_COLUMNS)
+            for r in field.rabbits:
+                r.caught = False
+            field.foxes = _animals(sim.Fox, state, 'fox_', FOX_COLUMNS)
+        field.grass = state['grass'].copy()
+        field.cycle = int(state['cycle'])
+        field.dirty = None  # The display grid is not saved, so the first render redraws everything
+
+        if seed is not None:
+            field.rng = sim.make_streams(seed)
+        else:
+            for name, stream_state in json.loads(str(state['streams'])).items():
+                field.rng[name].bit_generator.state = stream_state
+    return field
+
+
+def _herd(state, prefix, columns):
+    """Rebuild a Herd from the saved columns of one species."""
+    herd = sim.Herd(state[prefix + 'x'], state[prefix + 'y'])
+    for name in columns:
+        setattr(herd, name, state[prefix + name].astype(int))
+    return herd
+
+
+def _animals(kind, state, prefix, columns):
+    """Rebuild a list of Rabbit or Fox objects from the saved columns of one species."""
+    animals = [kind.__new__(kind) for _ in range(len(state[prefix + 'x']))]
+    for name in columns:
+        for animal, value in zip(animals, state[prefix + name].tolist()):
+            setattr(animal, name, value)
+    return animals
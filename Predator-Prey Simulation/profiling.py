@@ -0,0 +1,56 @@
+"""
+File: profiling.py
+Description: Observers for the per-phase statistics reported by Field.generation().
+Attach them with field.add_observer(...). A field without observers skips profiling entirely.
+"""
+
+import json
+import tracemalloc
+
+
+class PhaseProfiler:
+    """Observer that accumulates time, population change and allocations per phase over a run."""
+
+    def __init__(self, allocations=False):
+        """Initialize empty totals; with allocations=True, tracemalloc is started to measure memory."""
+        self.totals = {}  # phase -> summed statistics
+        if allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def __call__(self, field, records):
+        """Add one generation's records to the totals."""
+        for record in records:
+            totals = self.totals.setdefault(record['phase'], {'generations': 0, 'seconds': 0.0,
+                                                               'rabbits_change': 0, 'foxes_change': 0})
+            totals['generations'] += 1
+            totals['seconds'] += record['seconds']
+            totals['rabbits_change'] += record['rabbits_out'] - record['rabbits_in']
+            totals['foxes_change'] += record['foxes_out'] - record['foxes_in']
+            if 'allocated' in record:
+                totals['allocated'] = totals.get('allocated', 0) + record['allocated']
+
+    def summary(self):
+        """Return a text table of the totals, one line per phase, with its share of the total time."""
+        elapsed = sum(totals['seconds'] for totals in self.totals.values()) or 1.0
+        lines = [f"{'phase':<10}{'seconds':>12}{'share':>8}{'rabbits':>12}{'foxes':>12}{'allocated':>14}"]
+        for phase, totals in self.totals.items():
+            allocated = totals.get('allocated', '-')
+            lines.append(f"{phase:<10}{totals['seconds']:>12.4f}{totals['seconds'] / elapsed:>8.1%}"
+                         f"{totals['rabbits_change']:>12}{totals['foxes_change']:>12}{allocated:>14}")
+        return '\n'.join(lines)
+
+
+class TraceWriter:
+    """Observer that writes every generation's records to a JSON-lines file, one line per generation."""
+
+    def __init__(self, path):
+        """Open the trace file for writing."""
+        self.file = open(path, 'w')
+
+    def __call__(self, field, records):
+        """Write one generation to the trace."""
+        self.file.write(json.dumps({'cycle': field.cycle, 'phases': records}) + '\n')
+
+    def close(self):
+        """Close the trace file."""
+        self.file.close()
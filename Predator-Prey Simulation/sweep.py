@@ -0,0 +1,138 @@
+"""
+File: sweep.py
+Description: Parallel parameter sweep for the fox and rabbit simulation.
+Every combination of the parameter grid is run for a number of replicates across a process pool.
+Each run has its own deterministic seed, and results are appended to one CSV table as they finish,
+so an interrupted sweep can be restarted and will skip the runs already in the table.
+"""
+
+import argparse
+import csv
+import hashlib
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import HW_5 as sim
+import batch
+
+METRICS = ('final_rabbits', 'final_foxes', 'mean_rabbits', 'mean_foxes', 'peak_rabbits', 'peak_foxes',
+           'mean_grass', 'seconds')
+
+
+def expand(grid, replicates, seed=0):
+    """Expand a grid {setting: [values]} into one task per combination and replicate.
+    The seed of a task depends only on the base seed and the task's parameter values and replicate, so
+    adding values to the grid of a resumed sweep leaves the seeds of the other tasks unchanged."""
+    names = list(grid)
+    tasks = []
+    for combo in itertools.product(*(grid[name] for name in names)):
+        for replicate in range(replicates):
+            task = dict(zip(names, combo), replicate=replicate)
+            task['seed'] = task_seed(task, seed)
+            tasks.append(task)
+    return tasks
+
+
+def task_seed(task, seed=0):
+    """Seed of a task derived from the base seed and a stable encoding of the task's settings and replicate,
+    written as they appear in the CSV."""
+    encoded = repr(sorted((name, str(value)) for name, value in task.items() if name != 'seed'))
+    key = int.from_bytes(hashlib.sha256(encoded.encode()).digest()[:8], 'little')
+    return int(np.random.SeedSequence([seed, key]).generate_state(1)[0])
+
+
+def simulate(task, generations, backend, base):
+    """Run one task in a worker process and return its row of the results table."""
+    settings = dict(base)
+    settings.update({name: value for name, value in task.items() if name not in ('replicate', 'seed')})
+    sim.configure(**settings)
+
+    start = time.perf_counter()
+    series = batch.run(generations, backend, seed=task['seed'])
+    row = dict(task, generations=generations, **base)
+    row.update(final_rabbits=series['rabbits'][-1], final_foxes=series['foxes'][-1],
+               mean_rabbits=series['rabbits'].mean(), mean_foxes=series['foxes'].mean(),
+               peak_rabbits=series['rabbits'].max(), peak_foxes=series['foxes'].max(),
+               mean_grass=series['grass'].mean(), seconds=time.perf_counter() - start)
+    return row
+
+
+def task_key(row, names):
+    """Identify a run by its parameter values and replicate number, as they appear in the CSV."""
+    return tuple(str(row[name]) for name in names)
+
+
+def sweep(grid, replicates, generations, path, backend='array', seed=0, workers=None, base=None):
+    """Run every task of the grid that is not already in the table at path, appending one row per
+    finished run. The base settings and the number of generations are written with every row, and resuming
+    a table made with different ones raises ValueError. Returns the number of runs performed."""
+    base = base or {}
+    fixed = dict(base, generations=generations)
+    columns = list(grid) + list(fixed) + ['replicate', 'seed'] + list(METRICS)
+    key_names = list(grid) + ['replicate']
+    tasks = expand(grid, replicates, seed)
+
+    done = set()
+    fresh = not os.path.exists(path) or os.path.getsize(path) == 0
+    if not fresh:
+        with open(path, newline='') as f:
+            reader = csv.DictReader(f)
+            if reader.fieldnames != columns:
+                raise ValueError(f"{path} holds a sweep over different columns: {reader.fieldnames}")
+            rows = list(reader)
+            for name, value in fixed.items():
+                found = {row[name] for row in rows} - {str(value)}
+                if found:
+                    raise ValueError(f"{path} holds runs with {name} {', '.join(sorted(found))}, not {value}")
+            done = {task_key(row, key_names) for row in rows}
+    pending = [task for task in tasks if task_key(task, key_names) not in done]
+
+    with open(path, 'a', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        if fresh:
+            writer.writeheader()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(simulate, task, generations, backend, base) for task in pending]
+            for future in as_completed(futures):
+                writer.writerow(future.result())
+                f.flush()
+    return len(pending)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Parameter sweep of the fox and rabbit simulation')
+    parser.add_argument('-g', '--grass_rate', type=float, nargs='+', default=[sim.GRASS_RATE],
+                        help='Grass growth rates to try')
+    parser.add_argument('-kc', '--k_count', type=int, nargs='+', default=[sim.K_COUNT],
+                        help='Foxes KCount values to try')
+    parser.add_argument('-nr', '--init_rabbits', type=int, nargs='+', default=[sim.INIT_RABBITS],
+                        help='Initial rabbit counts to try')
+    parser.add_argument('-nf', '--init_foxes', type=int, nargs='+', default=[sim.INIT_FOXES],
+                        help='Initial fox counts to try')
+    parser.add_argument('-fs', '--field_size', type=int, default=sim.SIZE,
+                        help='Size of the field for every run')
+    parser.add_argument('-n', '--generations', type=int, required=True,
+                        help='Number of generations per run')
+    parser.add_argument('-r', '--replicates', type=int, default=1,
+                        help='Number of runs per parameter combination')
+    parser.add_argument('-s', '--seed', type=int, default=0,
+                        help='Base seed the per-run seeds are derived from')
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help='Number of worker processes (default: one per core)')
+    parser.add_argument('-b', '--backend', choices=['object', 'array'], default='array',
+                        help='Store animals as Python objects or as NumPy arrays')
+    parser.add_argument('-o', '--output', default='sweep.csv',
+                        help='Results table; an existing table is resumed')
+    args = parser.parse_args()
+
+    grid = {'grass_rate': args.grass_rate, 'k_count': args.k_count,
+            'init_rabbits': args.init_rabbits, 'init_foxes': args.init_foxes}
+    runs = sweep(grid, args.replicates, args.generations, args.output, args.backend, args.seed, args.workers,
+                 base={'size': args.field_size})
+    print("Completed runs:", runs, "Written to:", args.output)
+
+
+if __name__ == '__main__':
+    main()
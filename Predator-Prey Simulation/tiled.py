@@ -0,0 +1,205 @@
+"""
+File: tiled.py
+Description: Multi-core stepping of very large fields by domain decomposition.
+The field is cut into strips of rows (tiles), each stepped by its own worker process. The grass
+grid lives in shared memory and each worker owns the animals standing in its strip.
+
+Animals only interact with grass and other animals in their own cell. So instead of exchanging
+halo rows, animals that leave a strip (up to 2 rows for a fox move, up to 10 for an offspring
+placed in the previous generation) migrate to the tile that now holds them right after moving.
+Eating, survival and reproduction then run in each tile exactly as in a single ArrayField.
+Moves use global coordinates, so WRAP behaves the same as in one process.
+"""
+
+import os
+import time
+from multiprocessing import Pipe, Process
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+import HW_5 as sim
+
+
+class Tile(sim.ArrayField):
+    """ArrayField that owns the animals in rows lo..hi-1 of a shared grass grid."""
+
+    def __init__(self, lo, hi, grass, seed):
+        """Initialize an empty tile over a view of the shared grass grid, with its own random streams and
+        without a display grid."""
+        self.lo = lo
+        self.hi = hi
+        self.rabbits = sim.Herd()
+        self.foxes = sim.Herd()
+        self.grass = grass
+        self.dirty = None  # Tiles never render, so changed cells are not tracked
+        self.cycle = 0
+        self.rng = sim.make_streams(seed)
+
+    def emigrate(self):
+        """Remove and return the rabbits and foxes standing outside this tile's rows."""
+        leaving = []
+        for herd in (self.rabbits, self.foxes):
+            outside = (herd.x < self.lo) | (herd.x >= self.hi)
+            leaving.append(herd.take(outside))
+            herd.keep(~outside)
+        return leaving
+
+    def grow(self):
+        """Simulates grass growth in this tile's rows only."""
+        rows = self.grass[self.lo:self.hi]
+        growloc = (self.rng['grass'].random(rows.shape) < sim.GRASS_RATE) & (rows == 0)
+        rows[growloc] = 1
+
+
+def work(conn, lo, hi, settings, seed, name):
+    """Worker process loop: step one tile on the commands sent by TiledField."""
+    sim.configure(**settings)
+    memory = SharedMemory(name=name)
+    tile = Tile(lo, hi, np.ndarray((sim.SIZE, sim.SIZE), dtype=np.int8, buffer=memory.buf), seed)
+
+    while True:
+        command, payload = conn.recv()
+        if command == 'move':
+            start = time.perf_counter()
+            tile.move()
+            leaving = tile.emigrate()
+            conn.send((leaving, time.perf_counter() - start))
+        elif command == 'place':
+            tile.rabbits.extend(payload[0])
+            tile.foxes.extend(payload[1])
+        elif command == 'settle':
+            tile.rabbits.extend(payload[0])
+            tile.foxes.extend(payload[1])
+            timings = {}
+            for phase in sim.PHASES[1:]:
+                start = time.perf_counter()
+                getattr(tile, phase)()
+                timings[phase] = time.perf_counter() - start
+            conn.send((tile.population(), timings))
+        elif command == 'collect':
+            conn.send((tile.rabbits, tile.foxes))
+        else:
+            break
+
+    del tile
+    memory.close()
+
+
+class TiledField:
+    """Field stepped in parallel by worker processes, one per strip of rows. It offers the same
+    generation(), population(), grass_coverage() and render() as Field. Call close() when done."""
+
+    def __init__(self, tiles=None, seed=None):
+        """Start one worker per tile (one per core by default) over a shared grid full of grass."""
+        tiles = min(tiles or os.cpu_count(), sim.SIZE)
+        self.bounds = np.linspace(0, sim.SIZE, tiles + 1).astype(int)
+        self.memory = SharedMemory(create=True, size=sim.SIZE * sim.SIZE)
+        self.grass = np.ndarray((sim.SIZE, sim.SIZE), dtype=np.int8, buffer=self.memory.buf)
+        self.grass[:] = 1
+        self.field = np.ones(shape=(sim.SIZE, sim.SIZE), dtype=int)
+        self.cycle = 0
+        self.counts = (0, 0)
+
+        # The field's own streams place new animals; every tile gets independent streams of its own
+        sequence, *seeds = np.random.SeedSequence(seed).spawn(tiles + 1)
+        self.rng = sim.make_streams(sequence)
+        self.conns = []
+        self.workers = []
+        for t in range(tiles):
+            parent, child = Pipe()
+            worker = Process(target=work, daemon=True,
+                             args=(child, self.bounds[t], self.bounds[t + 1], sim.settings(), seeds[t],
+                                   self.memory.name))
+            worker.start()
+            self.conns.append(parent)
+            self.workers.append(worker)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Stop the workers and release the shared grass grid."""
+        for conn in self.conns:
+            conn.send(('stop', None))
+        for worker in self.workers:
+            worker.join()
+        self.conns = []
+        self.workers = []
+        del self.grass
+        self.memory.close()
+        self.memory.unlink()
+
+    def route(self, rabbits, foxes):
+        """Split rabbits and foxes by the tile whose rows contain them, one (rabbits, foxes) pair per tile."""
+        parts = []
+        for herd in (rabbits, foxes):
+            tile = np.searchsorted(self.bounds, herd.x, side='right') - 1
+            parts.append([herd.take(tile == t) for t in range(len(self.conns))])
+        return list(zip(*parts))
+
+    def add_rabbits(self, n):
+        """Add n rabbits at random locations."""
+        self.add(sim.Herd(*self.rng['placement'].integers(0, sim.SIZE, (2, n))), sim.Herd())
+
+    def add_foxes(self, n):
+        """Add n foxes at random locations."""
+        self.add(sim.Herd(), sim.Herd(*self.rng['placement'].integers(0, sim.SIZE, (2, n))))
+
+    def add(self, rabbits, foxes):
+        """Distribute new animals to their tiles without stepping the field."""
+        for conn, herds in zip(self.conns, self.route(rabbits, foxes)):
+            conn.send(('place', herds))
+        self.counts = (self.counts[0] + len(rabbits), self.counts[1] + len(foxes))
+
+    def generation(self, timings=None):
+        """Executes a generation cycle on every tile in parallel, migrating animals between tiles after
+        they move. If a timings dict is given, the slowest tile's time per phase is stored in it."""
+        for conn in self.conns:
+            conn.send(('move', None))
+        moved = [conn.recv() for conn in self.conns]
+
+        leaving = [r for (r, _), _ in moved], [f for (_, f), _ in moved]
+        arriving = self.route(_merge(leaving[0]), _merge(leaving[1]))
+        for conn, herds in zip(self.conns, arriving):
+            conn.send(('settle', herds))
+        settled = [conn.recv() for conn in self.conns]
+
+        self.counts = tuple(int(n) for n in np.sum([counts for counts, _ in settled], axis=0))
+        self.cycle += 1
+        if timings is not None:
+            timings['move'] = max(seconds for _, seconds in moved)
+            for phase in sim.PHASES[1:]:
+                timings[phase] = max(tile_timings[phase] for _, tile_timings in settled)
+
+    def population(self):
+        """Number of rabbits and number of foxes."""
+        return self.counts
+
+    def grass_coverage(self):
+        """Fraction of the field covered by grass."""
+        return np.count_nonzero(self.grass) / self.grass.size
+
+    def collect(self):
+        """Gather the rabbits and foxes of all tiles into one herd per species."""
+        for conn in self.conns:
+            conn.send(('collect', None))
+        herds = [conn.recv() for conn in self.conns]
+        return _merge([r for r, _ in herds]), _merge([f for _, f in herds])
+
+    def render(self):
+        """Redraw the display grid from the shared grass and every tile's animals, and return it."""
+        rabbits, foxes = self.collect()
+        np.copyto(self.field, self.grass)
+        self.field[rabbits.x, rabbits.y] = 2
+        self.field[foxes.x, foxes.y] = 3
+        return self.field
+
+
+def _merge(herds):
+    """Concatenate several herds into one."""
+    merged = sim.Herd()
+    for herd in herds:
+        merged.extend(herd)
+    return merged